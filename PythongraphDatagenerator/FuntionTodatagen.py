@@ -1,3 +1,4 @@
+import argparse
 import tkinter as tk
 from tkinter import filedialog, ttk
 import cv2
@@ -8,18 +9,42 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import queue
 import threading
 import time
-from scipy.optimize import curve_fit, minimize
+from dataclasses import dataclass
+from typing import Optional
 from scipy import interpolate
-import numpy.linalg as la
 
+from Utils.curve_fitting import DECIMATE_TOLERANCE, CurveFitter, FitJob, cubic_function, evaluate_function, format_function
 from Utils.grid_detector import GridDetector
 from Utils.image_processing import ImageProcessor
 from Utils.plot_manager import PlotManager
 from Utils.math_Utils import MathUtils
-from Utils.function_optimizer import OptimizationResult
+from Utils.overlay_view import OverlayView
+from Utils.segmentation import insert_breaks
+
+@dataclass
+class LoadProgress:
+    generation: int
+    stage: str
+    fraction: float
+
+@dataclass
+class LoadResult:
+    generation: int
+    image: Optional[np.ndarray] = None
+    points: Optional[np.ndarray] = None
+    grid_info: object = None
+    preview: Optional[Image.Image] = None
+    grid_image: Optional[np.ndarray] = None
+    function_image: Optional[np.ndarray] = None
+    error: Optional[str] = None
+
+class LoadSuperseded(Exception):
+    """Raised in a load thread once a newer load has started"""
 
 class EnhancedFunctionDecoder:
-    def __init__(self):
+    def __init__(self, seed=None):
+        # Every fit draws from a Generator seeded with this, so refits are reproducible
+        self.seed = seed
         self.root = tk.Tk()
         self.root.title("Enhanced Function Graph Decoder")
         self.root.geometry("1200x800")
@@ -40,6 +65,19 @@ class EnhancedFunctionDecoder:
         self.is_processing = False
         self.update_queue = queue.Queue()
         
+        # The single optimization job allowed at a time, and the thread running it
+        self.fit_job = None
+        self.fit_thread = None
+        self.fit_method = None
+        
+        # Each load gets a new generation; messages from older ones are stale
+        self.load_generation = 0
+        self.is_loading = False
+        self.is_polling = False
+        
+        # Rendered overlays with the image and GridInfo they were drawn from
+        self.overlay_cache = None
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -80,11 +118,24 @@ class EnhancedFunctionDecoder:
         method_frame = ttk.Frame(control_panel)
         method_frame.pack(fill="x", pady=5)
         ttk.Label(method_frame, text="Optimization Method:").pack(side="left")
-        self.method_var = tk.StringVar(value="vectorized")
+        self.method_var = tk.StringVar(value="auto")
+        ttk.Radiobutton(method_frame, text="Auto", variable=self.method_var,
+                       value="auto").pack(side="left")
         ttk.Radiobutton(method_frame, text="Vectorized", variable=self.method_var, 
                        value="vectorized").pack(side="left")
         ttk.Radiobutton(method_frame, text="Curve Fit", variable=self.method_var,
                        value="curve_fit").pack(side="left")
+        ttk.Radiobutton(method_frame, text="RANSAC", variable=self.method_var,
+                       value="ransac").pack(side="left")
+        
+        budget_frame = ttk.Frame(control_panel)
+        budget_frame.pack(fill="x", pady=5)
+        ttk.Label(budget_frame, text="Time budget (s):").pack(side="left")
+        self.time_budget_var = tk.StringVar(value="30")
+        ttk.Entry(budget_frame, textvariable=self.time_budget_var, width=6).pack(side="left", padx=2)
+        ttk.Label(budget_frame, text="Max evaluations:").pack(side="left")
+        self.max_evaluations_var = tk.StringVar(value="100000")
+        ttk.Entry(budget_frame, textvariable=self.max_evaluations_var, width=8).pack(side="left", padx=2)
         
         # Status and progress
         self.status_text = tk.StringVar(value="Ready")
@@ -108,6 +159,7 @@ class EnhancedFunctionDecoder:
         self.grid_canvas = FigureCanvasTkAgg(plt.Figure(figsize=(6, 8)), master=grid_panel)
         self.grid_canvas.get_tk_widget().pack(fill="both", expand=True)
         self.grid_ax = self.grid_canvas.figure.add_subplot(111)
+        self.grid_view = OverlayView(self.grid_ax, self.grid_canvas)
         
     def setup_function_panel(self, parent):
         function_panel = ttk.LabelFrame(parent, text="Function Detection", padding=5)
@@ -116,97 +168,78 @@ class EnhancedFunctionDecoder:
         self.function_canvas = FigureCanvasTkAgg(plt.Figure(figsize=(6, 8)), master=function_panel)
         self.function_canvas.get_tk_widget().pack(fill="both", expand=True)
         self.function_ax = self.function_canvas.figure.add_subplot(111)
+        self.function_view = OverlayView(self.function_ax, self.function_canvas)
         
     def vectorized_optimization(self, x, y, critical_points=None):
         """Optimized vectorized parameter estimation"""
-        # Create design matrix for cubic function
-        X = np.vstack([x**3, x**2, x, np.ones_like(x)]).T
-        
-        # Use SVD for stable solution
-        U, S, Vh = la.svd(X, full_matrices=False)
-        
-        # Calculate parameters using pseudo-inverse
-        params = Vh.T @ (1/S * (U.T @ y))
-        params = params / 4  # Scale parameters
-        
-        # Refine using L-BFGS-B if critical points are available
-        if critical_points:
-            def objective(p):
-                pred = self.target_function(x, *p)
-                mse = np.mean((y - pred)**2)
-                
-                # Add critical points constraint
-                critical_error = 0
-                for point_type, px, py in critical_points:
-                    pred_y = self.target_function(np.array([px]), *p)
-                    critical_error += np.abs(pred_y - py)[0]
-                
-                return mse + 0.1 * critical_error
-            
-            result = minimize(objective, params, method='L-BFGS-B')
-            params = result.x
-            
-        return params
+        return CurveFitter().vectorized_optimization(x, y, critical_points)
     
     def curve_fit_optimization(self, x, y, critical_points=None):
         """Optimization using scipy's curve_fit"""
-        def target_func(x, a, b, c, d):
-            return (a * np.power(x, 3) + b * np.power(x, 2) + c * x + d) / 4
-        
-        # Get initial parameter estimates
-        p0 = self.vectorized_optimization(x, y)
-        
-        # Perform curve fitting
-        params, _ = curve_fit(target_func, x, y, p0=p0, maxfev=1000)
-        
-        return params
+        return CurveFitter().curve_fit_optimization(x, y, critical_points)
     
     def target_function(self, x, a, b, c, d):
         """Vectorized target function"""
-        return (a * np.power(x, 3) + b * np.power(x, 2) + c * x + d) / 4
+        return cubic_function(x, a, b, c, d)
     
-    def optimization_thread(self):
+    def optimization_thread(self, job, method, points, critical_points, previous=None):
         try:
-            x = self.normalized_points[:, 0]
-            y = self.normalized_points[:, 1]
-            
-            # Choose optimization method
-            if self.method_var.get() == "vectorized":
-                params = self.vectorized_optimization(x, y, self.grid_info.critical_points)
-            else:
-                params = self.curve_fit_optimization(x, y, self.grid_info.critical_points)
+            # A superseded job unwinds at its next evaluation; wait so they never overlap
+            if previous is not None:
+                previous.join()
             
-            # Calculate error
-            pred_y = self.target_function(x, *params)
-            error = np.mean((y - pred_y)**2)
+            # Fitting itself lives in Utils.curve_fitting so it also runs headless
+            fitter = CurveFitter(method, decimate_tolerance=DECIMATE_TOLERANCE,
+                                 rng=np.random.default_rng(self.seed))
+            result = fitter.fit(points, critical_points, job=job)
             
-            # Update display
-            self.update_queue.put(OptimizationResult(params, error, "cubic", 0))
-            self.update_queue.put(None)
+            # Tagged with the job, so update_display can drop what a superseded one sends
+            self.update_queue.put((job, result))
+            self.update_queue.put((job, None))
             
         except Exception as e:
-            self.status_text.set(f"Optimization error: {str(e)}")
-            self.is_processing = False
+            self.update_queue.put((job, f"Optimization error: {str(e)}"))
+    
+    def render_overlays(self, image, points, grid_info):
+        """RGB grid and function overlays; pure image work, safe off the Tk thread"""
+        grid_image = self.image_processor.visualize_grid(image, grid_info)
+        function_image = self.image_processor.visualize_function(image, points, grid_info)
+        return (cv2.cvtColor(grid_image, cv2.COLOR_BGR2RGB),
+                cv2.cvtColor(function_image, cv2.COLOR_BGR2RGB))
+    
+    def show_overlays(self, grid_image, function_image):
+        # Image artists are reused; only their data changes
+        self.grid_view.set_image(grid_image)
+        self.function_view.set_image(function_image)
+        self.function_view.clear_curve()
+        self.overlay_cache = (self.current_image, self.grid_info, self.normalized_points,
+                              grid_image, function_image)
     
     def update_visualizations(self):
         if self.current_image is None:
             return
         
-    # Update grid visualization
-        grid_image = self.image_processor.visualize_grid(self.current_image, self.grid_info)
-        self.grid_ax.clear()
-        self.grid_ax.imshow(cv2.cvtColor(grid_image, cv2.COLOR_BGR2RGB))
-        self.grid_ax.axis('off')
-        self.grid_canvas.draw()
-    
-    # Update function visualization
-        function_image = self.image_processor.visualize_function(
+        # Overlays only change with the image, its GridInfo or its points
+        cache = self.overlay_cache
+        if (cache is not None and cache[0] is self.current_image
+                and cache[1] is self.grid_info and cache[2] is self.normalized_points):
+            return
+        
+        self.show_overlays(*self.render_overlays(
             self.current_image, self.normalized_points, self.grid_info
-        )
-        self.function_ax.clear()
-        self.function_ax.imshow(cv2.cvtColor(function_image, cv2.COLOR_BGR2RGB))
-        self.function_ax.axis('off')
-        self.function_canvas.draw()
+        ))
+    
+    def show_fit(self, result):
+        """Draw a fitted function over the function overlay by blitting"""
+        grid_info = self.grid_info
+        points = self.normalized_points
+        if grid_info is None or grid_info.origin is None or points is None or not len(points):
+            return
+        
+        x = np.linspace(points[:, 0].min(), points[:, 0].max(), 400)
+        x, y = insert_breaks(x, evaluate_function(result.function_type, x, result.params))
+        self.function_view.set_curve(x * grid_info.x_scale + grid_info.origin[0],
+                                     grid_info.origin[1] - y * grid_info.y_scale)
     
     def load_image(self):
         file_path = filedialog.askopenfilename(
@@ -214,42 +247,85 @@ class EnhancedFunctionDecoder:
         )
         if not file_path:
             return
-            
+        
+        # A job fitting the previous image has nothing left to report
+        if self.fit_job is not None:
+            self.fit_job.cancel()
+            self.fit_job = None
+            self.is_processing = False
+        
+        # Supersede any load still in flight rather than queuing behind it
+        self.load_generation += 1
+        self.is_loading = True
+        self.status_text.set("Loading image...")
+        self.progress_var.set(0)
+        
+        threading.Thread(target=self.load_thread, args=(file_path, self.load_generation),
+                         daemon=True).start()
+        self.start_polling()
+    
+    def load_thread(self, file_path, generation):
+        """Read, process and render an image off the Tk thread, reporting each stage"""
+        def report(stage, fraction):
+            if generation != self.load_generation:
+                raise LoadSuperseded()
+            self.update_queue.put(LoadProgress(generation, stage, fraction))
+        
         try:
-            self.status_text.set("Loading image...")
-            
-            # Load and process image
-            self.current_image = cv2.imread(file_path)
-            if self.current_image is None:
+            report("Reading image", 0.0)
+            image = cv2.imread(file_path)
+            if image is None:
                 raise ValueError("Failed to load image")
             
             # Process image and detect grid
-            self.normalized_points, self.grid_info = self.image_processor.process_image(self.current_image)
+            points, grid_info = self.image_processor.process_image(
+                image, progress=lambda stage, fraction: report(stage, 0.1 + 0.6 * fraction)
+            )
             
-            # Update visualizations
-            self.update_visualizations()
-            
-            # Display input image
-            display_image = cv2.cvtColor(self.current_image, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(display_image)
+            report("Rendering overlays", 0.7)
+            grid_image, function_image = self.render_overlays(image, points, grid_info)
             
             # Resize maintaining aspect ratio
+            pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
             display_height = 200
             aspect_ratio = pil_image.width / pil_image.height
             display_width = int(display_height * aspect_ratio)
-            pil_image = pil_image.resize((display_width, display_height), Image.Resampling.LANCZOS)
-            
-            # Update display
-            photo = ImageTk.PhotoImage(pil_image)
-            self.image_label.configure(image=photo)
-            self.image_label.image = photo
-            
-            self.status_text.set("Image loaded successfully")
+            preview = pil_image.resize((display_width, display_height), Image.Resampling.LANCZOS)
             
+            report("Displaying", 0.9)
+            self.update_queue.put(LoadResult(generation, image, points, grid_info, preview,
+                                             grid_image, function_image))
+        
+        except LoadSuperseded:
+            pass
         except Exception as e:
-            self.status_text.set(f"Error: {str(e)}")
+            self.update_queue.put(LoadResult(generation, error=str(e)))
+    
+    def apply_load_result(self, result):
+        """Install a finished load on the Tk thread"""
+        self.is_loading = False
+        if result.error:
+            self.status_text.set(f"Error: {result.error}")
+            return
+        
+        self.current_image = result.image
+        self.normalized_points = result.points
+        self.grid_info = result.grid_info
+        self.show_overlays(result.grid_image, result.function_image)
+        
+        # PhotoImage must be created on the Tk thread
+        photo = ImageTk.PhotoImage(result.preview)
+        self.image_label.configure(image=photo)
+        self.image_label.image = photo
+        
+        self.progress_var.set(100)
+        self.status_text.set("Image loaded successfully")
     
     def start_processing(self):
+        if self.is_loading:
+            self.status_text.set("Image is still loading")
+            return
+        
         if self.current_image is None:
             self.status_text.set("Please load an image first")
             return
@@ -258,39 +334,88 @@ class EnhancedFunctionDecoder:
             self.status_text.set("No graph points detected")
             return
         
+        try:
+            time_budget = float(self.time_budget_var.get())
+            max_evaluations = int(self.max_evaluations_var.get())
+        except ValueError:
+            self.status_text.set("Invalid budget")
+            return
+        
+        # At most one job per image: a new start replaces the running one
+        if self.fit_job is not None:
+            self.fit_job.cancel()
+        previous = self.fit_thread
+        
         self.is_processing = True
         self.results_text.delete(1.0, tk.END)
         self.progress_var.set(0)
         
         # Start optimization in background thread
-        threading.Thread(target=self.optimization_thread, daemon=True).start()
+        self.fit_method = self.method_var.get()
+        self.fit_job = FitJob(time_budget=time_budget, max_evaluations=max_evaluations)
+        self.fit_thread = threading.Thread(
+            target=self.optimization_thread,
+            args=(self.fit_job, self.fit_method, self.normalized_points,
+                  self.grid_info.critical_points if self.grid_info else [], previous),
+            daemon=True
+        )
+        self.fit_thread.start()
         
         # Start display updates
-        self.update_display()
+        self.start_polling()
+    
+    def start_polling(self):
+        """Run update_display until no load or optimization is pending"""
+        if not self.is_polling:
+            self.is_polling = True
+            self.update_display()
     
     def update_display(self):
-        if not self.is_processing:
-            return
-        
         try:
             while True:
                 update = self.update_queue.get_nowait()
                 
+                if isinstance(update, (LoadProgress, LoadResult)):
+                    # Drop whatever a superseded load still managed to send
+                    if update.generation != self.load_generation:
+                        continue
+                    if isinstance(update, LoadProgress):
+                        self.progress_var.set(100 * update.fraction)
+                        self.status_text.set(f"{update.stage}...")
+                    else:
+                        self.apply_load_result(update)
+                    continue
+                
+                # Fit updates are (job, payload); only the current job's count
+                job, update = update
+                if job is not self.fit_job:
+                    continue
                 if update is None:
                     self.is_processing = False
-                    break
+                    continue
+                if isinstance(update, str):
+                    self.status_text.set(update)
+                    self.is_processing = False
+                    continue
                 
                 # Update progress
                 self.progress_var.set(100)
-                self.status_text.set(f"Optimization complete: Error = {update.error:.6f}")
+                if update.stop_reason:
+                    self.status_text.set(f"Optimization stopped ({update.stop_reason}), "
+                                         f"best so far: Error = {update.error:.6f}")
+                else:
+                    self.status_text.set(f"Optimization complete: Error = {update.error:.6f}")
                 
                 # Update function text
-                function_str = (f"f(x) = ({update.params[0]:.3f}x³ + "
-                              f"{update.params[1]:.3f}x² + "
-                              f"{update.params[2]:.3f}x + "
-                              f"{update.params[3]:.3f})/4")
+                function_str = format_function(update.function_type, update.params)
                 self.results_text.delete(1.0, tk.END)
-                self.results_text.insert(tk.END, function_str)
+                self.results_text.insert(tk.END, f"{update.function_type}\n{function_str}")
+                if update.elapsed > 0:
+                    unit = "hypotheses" if self.fit_method == "ransac" else "evaluations"
+                    self.results_text.insert(
+                        tk.END, f"\n{update.evaluations:,} {unit} in {1000 * update.elapsed:.1f} ms "
+                                f"({update.evaluations / update.elapsed:,.0f}/s)"
+                    )
                 
                 # Add critical points
                 if self.grid_info and self.grid_info.critical_points:
@@ -298,24 +423,35 @@ class EnhancedFunctionDecoder:
                     for point_type, x, y in self.grid_info.critical_points:
                         self.results_text.insert(tk.END, f"{point_type}: ({x:.2f}, {y:.2f})\n")
                         
-                # Update visualizations
+                # Update visualizations: overlays are cached, only the fitted curve is redrawn
                 self.update_visualizations()
+                self.show_fit(update)
                 
         except queue.Empty:
             pass
         
         # Schedule next update
-        if self.is_processing:
+        if self.is_processing or self.is_loading:
             self.root.after(20, self.update_display)
+        else:
+            self.is_polling = False
     
     def stop_processing(self):
-        self.is_processing = False
-        self.status_text.set("Processing stopped")
+        # The job stops at its next evaluation and still reports its best result
+        if self.is_processing and self.fit_job is not None:
+            self.fit_job.cancel()
+            self.status_text.set("Stopping...")
+        else:
+            self.status_text.set("Processing stopped")
     
     def run(self):
         self.root.mainloop()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enhanced Function Graph Decoder")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible fits")
+    args = parser.parse_args()
+    
     try:
         # Set DPI awareness for Windows
         from ctypes import windll
@@ -324,5 +460,5 @@ if __name__ == "__main__":
         pass
     
     # Start application
-    app = EnhancedFunctionDecoder()
+    app = EnhancedFunctionDecoder(args.seed)
     app.run()
\ No newline at end of file
@@ -1,6 +1,5 @@
 import numpy as np
 from scipy.interpolate import make_interp_spline
-import json
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import tkinter as tk
@@ -9,38 +8,40 @@ import webbrowser
 import tempfile
 import os
 
+from Utils.point_io import load_points
+
 class ModernFunctionViewer:
     def __init__(self):
-        self.points = None
+        self.x_coords = None
+        self.y_coords = None
+        self.metadata = None
         self.spline_function = None
         self.x_range = None
         self.y_range = None
         self.critical_points = None
         
+    def load_points(self, filename):
+        """Load points from a JSON export or a memory-mapped .npz export"""
+        self.x_coords, self.y_coords, self.metadata = load_points(filename)
+        self.x_range = self.metadata['x_range']
+        self.y_range = [float(np.min(self.y_coords)), float(np.max(self.y_coords))]
+        
     def load_points_from_json(self, filename):
         """Load points from a JSON file"""
-        with open(filename, 'r') as f:
-            data = json.load(f)
-            self.points = [(point['x'], point['y']) for point in data['points']]
-            self.x_range = data['x_range']
-            y_coords = [p[1] for p in self.points]
-            self.y_range = [min(y_coords), max(y_coords)]
+        self.load_points(filename)
             
     def generate_function(self):
         """Generate a smooth function from points"""
-        if not self.points:
+        if self.x_coords is None or not len(self.x_coords):
             raise ValueError("No points loaded")
-            
-        x_coords, y_coords = zip(*self.points)
-        x_coords = np.array(x_coords)
-        y_coords = np.array(y_coords)
         
-        self.spline_function = make_interp_spline(x_coords, y_coords, k=3)
+        self.spline_function = make_interp_spline(self.x_coords, self.y_coords, k=3)
         self._find_critical_points()
         
     def _find_critical_points(self):
         """Find all critical points of the function"""
-        x_coords, y_coords = zip(*self.points)
+        x1, x2 = self.x_coords[:-1], self.x_coords[1:]
+        y1, y2 = self.y_coords[:-1], self.y_coords[1:]
         
         self.critical_points = {
             'x_intercepts': [],
@@ -49,34 +50,29 @@ class ModernFunctionViewer:
             'maximum': None
         }
         
-        # Find intercepts and extrema
-        for i in range(len(self.points)-1):
-            x1, y1 = self.points[i]
-            x2, y2 = self.points[i+1]
-            
+        with np.errstate(divide='ignore', invalid='ignore'):
             # X-intercepts
-            if y1 * y2 <= 0:
-                x_intercept = x1 - y1 * (x2 - x1) / (y2 - y1)
-                self.critical_points['x_intercepts'].append((x_intercept, 0))
-                
+            idx = np.flatnonzero(y1 * y2 <= 0)
+            x_intercepts = x1[idx] - y1[idx] * (x2[idx] - x1[idx]) / (y2[idx] - y1[idx])
+            self.critical_points['x_intercepts'] = [(float(x), 0) for x in x_intercepts]
+            
             # Y-intercept
-            if x1 * x2 <= 0:
-                y_intercept = y1 - x1 * (y2 - y1) / (x2 - x1)
-                self.critical_points['y_intercept'] = (0, y_intercept)
+            idx = np.flatnonzero(x1 * x2 <= 0)
+            if len(idx):
+                i = idx[-1]
+                y_intercept = y1[i] - x1[i] * (y2[i] - y1[i]) / (x2[i] - x1[i])
+                self.critical_points['y_intercept'] = (0, float(y_intercept))
         
         # Find global minimum and maximum
-        y_coords = [p[1] for p in self.points]
-        min_idx = np.argmin(y_coords)
-        max_idx = np.argmax(y_coords)
-        self.critical_points['minimum'] = self.points[min_idx]
-        self.critical_points['maximum'] = self.points[max_idx]
+        min_idx = np.argmin(self.y_coords)
+        max_idx = np.argmax(self.y_coords)
+        self.critical_points['minimum'] = (float(self.x_coords[min_idx]), float(self.y_coords[min_idx]))
+        self.critical_points['maximum'] = (float(self.x_coords[max_idx]), float(self.y_coords[max_idx]))
         
     def create_interactive_plot(self):
         """Create an interactive plot using Plotly"""
-        x_coords, y_coords = zip(*self.points)
-        
         # Create a smoother curve for plotting
-        x_smooth = np.linspace(min(x_coords), max(x_coords), 1000)
+        x_smooth = np.linspace(np.min(self.x_coords), np.max(self.x_coords), 1000)
         y_smooth = self.spline_function(x_smooth)
         
         # Create the main function trace
@@ -180,7 +176,7 @@ class ModernFunctionViewer:
 
 def main():
     viewer = ModernFunctionViewer()
-    viewer.load_points_from_json('function_points_logarithmic_24001.json')
+    viewer.load_points('function_points_logarithmic_24001.json')
     viewer.generate_function()
     viewer.create_interactive_plot()
 
@@ -0,0 +1,118 @@
+from dataclasses import asdict, dataclass
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .segmentation import insert_breaks
+
+
+@dataclass
+class ChartStyle:
+    width: int = 800
+    height: int = 600
+    dpi: int = 100
+    line_width: float = 2.0
+    line_color: str = 'black'
+    grid: bool = True
+    grid_spacing: float = 1.0
+    axes: bool = True
+    noise: float = 0.0  # Std. dev. of Gaussian pixel noise on the 0-255 scale
+
+
+class ChartRenderer:
+    """Off-screen chart images of generated functions on the Agg backend
+
+    One figure is kept per resolution and only its artists are updated
+    between renders, which avoids rebuilding the figure for every image.
+    Never touches pyplot or any GUI toolkit.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng or np.random.default_rng()
+        self._figures = {}
+
+    def _figure(self, style):
+        """Reusable (canvas, axes, line) for the style's resolution"""
+        key = (style.width, style.height, style.dpi)
+        if key not in self._figures:
+            fig = Figure(figsize=(style.width / style.dpi, style.height / style.dpi), dpi=style.dpi)
+            canvas = FigureCanvasAgg(fig)
+            # Axes fill the whole image so pixel coordinates map linearly to data
+            ax = fig.add_axes([0, 0, 1, 1])
+            ax.set_axis_off()
+            # Grid and axes are single NaN-separated polylines, updated in place
+            grid, = ax.plot([], [], color='#c8c8c8', linewidth=1, zorder=0)
+            axes, = ax.plot([], [], color='#404040', linewidth=1.5, zorder=1)
+            line, = ax.plot([], [], zorder=2)
+            self._figures[key] = (canvas, ax, grid, axes, line)
+        return self._figures[key]
+
+    @staticmethod
+    def _polyline(xs, ys, x_range, y_range):
+        """Vertical lines at xs and horizontal lines at ys joined by NaN breaks"""
+        vertical = [[x, x, np.nan] for x in xs]
+        horizontal = [[x_range[0], x_range[1], np.nan] for _ in ys]
+        x = np.array(vertical + horizontal).ravel()
+        y = np.array([[y_range[0], y_range[1], np.nan] for _ in xs] +
+                     [[y, y, np.nan] for y in ys]).ravel()
+        return x, y
+
+    def _update_grid(self, grid, axes, style, x_range, y_range):
+        """Point the grid and axis artists at this render's ranges"""
+        if style.grid:
+            spacing = style.grid_spacing
+            xs = np.arange(np.ceil(x_range[0] / spacing), np.floor(x_range[1] / spacing) + 1) * spacing
+            ys = np.arange(np.ceil(y_range[0] / spacing), np.floor(y_range[1] / spacing) + 1) * spacing
+            grid.set_data(*self._polyline(xs, ys, x_range, y_range))
+        grid.set_visible(style.grid)
+
+        axes.set_data(*self._polyline([0], [0], x_range, y_range))
+        axes.set_visible(style.axes)
+
+    def render(self, generated, x_range, y_range, style=None):
+        """BGR uint8 image of the function plus its pixel mapping"""
+        style = style or ChartStyle()
+        canvas, ax, grid, axes, line = self._figure(style)
+
+        # Two samples per pixel column, broken at poles so no vertical jumps are drawn
+        x = np.linspace(x_range[0], x_range[1], 2 * style.width)
+        x, y = insert_breaks(x, generated.func(x))
+        line.set_data(x, y)
+        line.set_color(style.line_color)
+        line.set_linewidth(style.line_width)
+
+        self._update_grid(grid, axes, style, x_range, y_range)
+        ax.set_xlim(x_range)
+        ax.set_ylim(y_range)
+        canvas.draw()
+
+        rgb = np.asarray(canvas.buffer_rgba())[..., :3]
+        image = np.ascontiguousarray(rgb[..., ::-1])
+        if style.noise > 0:
+            noisy = image + self.rng.normal(0, style.noise, image.shape)
+            image = np.clip(noisy, 0, 255).astype(np.uint8)
+
+        # Image rows grow downwards while display coordinates grow upwards
+        origin_x, origin_y = ax.transData.transform((0, 0))
+        unit_x, unit_y = ax.transData.transform((1, 1))
+        height = image.shape[0]
+        mapping = {
+            'origin': [float(origin_x), float(height - origin_y)],
+            'x_scale': float(unit_x - origin_x),
+            'y_scale': float(unit_y - origin_y)
+        }
+        return image, mapping
+
+    def ground_truth(self, generated, x_range, y_range, style, mapping, critical_points):
+        """Sidecar record describing what an image shows"""
+        return {
+            'function_type': generated.function_type,
+            'label': generated.label,
+            'expr': str(generated.expr),
+            'x_range': list(x_range),
+            'y_range': list(y_range),
+            'pixel_mapping': mapping,
+            'critical_points': critical_points.to_dict(),
+            'style': asdict(style)
+        }
@@ -0,0 +1,236 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+import sympy as sp
+
+from .function_compiler import CompiledFunction
+from .segmentation import jump_steps
+
+
+@dataclass
+class CriticalPointAnalysis:
+    x_intercepts: List[float] = field(default_factory=list)
+    y_intercept: Optional[float] = None
+    minima: List[Tuple[float, float]] = field(default_factory=list)
+    maxima: List[Tuple[float, float]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def in_range(self, x_range):
+        """Copy restricted to points whose x lies inside x_range"""
+        lo, hi = x_range
+        return CriticalPointAnalysis(
+            x_intercepts=[x for x in self.x_intercepts if lo <= x <= hi],
+            y_intercept=self.y_intercept if lo <= 0 <= hi else None,
+            minima=[p for p in self.minima if lo <= p[0] <= hi],
+            maxima=[p for p in self.maxima if lo <= p[0] <= hi],
+            error=self.error
+        )
+
+    def to_lines(self):
+        """Human readable summary, one line per point"""
+        if self.error:
+            return [f"Error finding critical points: {self.error}"]
+
+        lines = [f"X-intercepts: {[round(x, 6) for x in self.x_intercepts]}"]
+        if self.y_intercept is not None:
+            lines.append(f"Y-intercept: {round(self.y_intercept, 6)}")
+        for x, y in self.minima:
+            lines.append(f"Local minimum: ({round(x, 6)}, {round(y, 6)})")
+        for x, y in self.maxima:
+            lines.append(f"Local maximum: ({round(x, 6)}, {round(y, 6)})")
+        return lines
+
+    def to_dict(self):
+        """JSON-serializable form used by exports"""
+        return {
+            'x_intercepts': self.x_intercepts,
+            'y_intercept': self.y_intercept,
+            'minima': [list(p) for p in self.minima],
+            'maxima': [list(p) for p in self.maxima],
+            'error': self.error
+        }
+
+
+def _real_roots(expr, symbol):
+    """Real solutions of expr = 0 as floats"""
+    return [float(val.evalf()) for val in sp.solve(expr, symbol) if val.is_real]
+
+
+# Expressions remembered by each cache below
+_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _analyze_expression(expr, symbol):
+    """Solve once per expression for every real intercept and extremum"""
+    try:
+        func = CompiledFunction(expr, symbol)
+        derivative = sp.diff(expr, symbol)
+
+        # Classify all stationary points with a single compiled second derivative
+        stationary = np.array(_real_roots(derivative, symbol), dtype=float)
+        second_derivative = CompiledFunction(sp.diff(derivative, symbol), symbol)
+        curvature = second_derivative(stationary)
+        values = func(stationary)
+
+        minima = [(float(x), float(y)) for x, y, c in zip(stationary, values, curvature) if c > 0]
+        maxima = [(float(x), float(y)) for x, y, c in zip(stationary, values, curvature) if c < 0]
+
+        y_intercept = func(0.0)
+        return CriticalPointAnalysis(
+            x_intercepts=sorted(_real_roots(expr, symbol)),
+            y_intercept=y_intercept if np.isfinite(y_intercept) else None,
+            minima=sorted(minima),
+            maxima=sorted(maxima)
+        )
+    except Exception as e:
+        return CriticalPointAnalysis(error=str(e))
+
+
+def _bisect_brackets(func, lo, hi, iterations=60):
+    """Refine every sign-change bracket simultaneously by vectorized bisection"""
+    f_lo = func(lo)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        f_mid = func(mid)
+        same_sign = np.signbit(f_mid) == np.signbit(f_lo)
+        lo = np.where(same_sign, mid, lo)
+        f_lo = np.where(same_sign, f_mid, f_lo)
+        hi = np.where(same_sign, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def _sign_change_roots(func, x, values, tolerance):
+    """Roots of func between consecutive grid samples, skipping poles"""
+    # Sign changes inside continuous segments only; jumps across poles are skipped up front
+    finite = np.isfinite(values[:-1]) & np.isfinite(values[1:])
+    flips = np.signbit(values[:-1]) != np.signbit(values[1:])
+    brackets = np.flatnonzero(finite & flips & ~jump_steps(values))
+    roots = _bisect_brackets(func, x[brackets], x[brackets + 1])
+
+    # A pole missed by the jump test still blows up instead of vanishing
+    with np.errstate(invalid='ignore'):
+        genuine = np.abs(func(roots)) < tolerance
+    return roots[genuine], brackets[genuine]
+
+
+def numeric_critical_points(func, derivative, x_range, samples=20001, tolerance=1e-6):
+    """Bracket sign changes of f and f' on a grid and refine them all at once
+
+    Brackets from every continuous segment are refined together in one
+    vectorized bisection.
+    """
+    x = np.linspace(x_range[0], x_range[1], samples)
+    y = func(x)
+    dy = derivative(x)
+
+    x_intercepts, _ = _sign_change_roots(func, x, y, tolerance)
+    stationary, brackets = _sign_change_roots(derivative, x, dy, tolerance)
+
+    # The direction of the sign change of f' tells minima from maxima
+    rising = dy[brackets + 1] > 0
+    values = func(stationary)
+    keep = np.isfinite(values)
+
+    y_intercept = func(0.0) if x_range[0] <= 0 <= x_range[1] else None
+    return CriticalPointAnalysis(
+        x_intercepts=[float(x) for x in x_intercepts],
+        y_intercept=y_intercept if y_intercept is not None and np.isfinite(y_intercept) else None,
+        minima=[(float(px), float(py)) for px, py in zip(stationary[rising & keep], values[rising & keep])],
+        maxima=[(float(px), float(py)) for px, py in zip(stationary[~rising & keep], values[~rising & keep])]
+    )
+
+
+# At most this many symbolic solves may keep running after their callers gave up
+MAX_BACKGROUND_SOLVES = 4
+
+# Symbolic solves still running, keyed like the cache, as (thread, result box)
+_pending_solves = {}
+# Results of solves that finished within their timeout
+_solved = OrderedDict()
+# Expressions whose solve overran once; they are answered numerically from then on
+_timed_out = OrderedDict()
+_pending_lock = threading.Lock()
+
+
+def _remember(cache, key, value):
+    """Insert into an OrderedDict used as an LRU of _CACHE_SIZE entries; call with _pending_lock held"""
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _background_solve(expr, symbol, box):
+    """Thread target: solve into box, then forget the pending entry"""
+    box['result'] = _analyze_expression(expr, symbol)
+    with _pending_lock:
+        _pending_solves.pop((expr, symbol), None)
+
+
+def _symbolic_with_timeout(expr, symbol, timeout):
+    """Symbolic analysis if it completes within timeout seconds, else None
+
+    Finished solves are remembered, and a thread is only started on a
+    miss. A solve that overruns is marked as timed out, and every later
+    call for the same expression returns None at once instead of waiting
+    again, so the answer for an expression never changes with timing.
+    The overrun thread cannot be stopped and finishes on its own; once
+    MAX_BACKGROUND_SOLVES of them are running, expressions not solved yet
+    are not solved symbolically at all.
+    """
+    key = (expr, symbol)
+    with _pending_lock:
+        if key in _solved:
+            _solved.move_to_end(key)
+            return _solved[key]
+        if key in _timed_out:
+            _timed_out.move_to_end(key)
+            return None
+        if key in _pending_solves:
+            # Another caller is waiting on the same expression within its timeout
+            thread, box = _pending_solves[key]
+        elif len(_pending_solves) >= MAX_BACKGROUND_SOLVES:
+            _remember(_timed_out, key, True)
+            return None
+        else:
+            box = {}
+            thread = threading.Thread(target=_background_solve, args=(expr, symbol, box), daemon=True)
+            _pending_solves[key] = (thread, box)
+            thread.start()
+
+    thread.join(timeout)
+    with _pending_lock:
+        if thread.is_alive() or key in _timed_out:
+            _remember(_timed_out, key, True)
+            return None
+        _remember(_solved, key, box['result'])
+        return box['result']
+
+
+def analyze_critical_points(expr, symbol, x_range, timeout=None, func=None):
+    """Structured critical points of expr within x_range, memoized per expression
+
+    With a timeout, symbolic solving is abandoned after that many seconds
+    and a numeric grid search answers instead. The numeric engine is also
+    used when sympy fails outright, and for periodic expressions, where
+    sp.solve only reports the principal solutions. A timeout of 0 skips
+    sympy altogether. func, an already compiled evaluator of expr with a
+    derivative() method, spares the numeric engine from compiling again.
+    """
+    if timeout == 0 or expr.has(sp.sin, sp.cos, sp.tan):
+        result = None
+    elif timeout is None:
+        result = _analyze_expression(expr, symbol)
+    else:
+        result = _symbolic_with_timeout(expr, symbol, timeout)
+
+    if result is None or result.error:
+        func = func or CompiledFunction(expr, symbol)
+        return numeric_critical_points(func, func.derivative(), x_range)
+
+    return result.in_range(x_range)
@@ -0,0 +1,602 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import numpy.linalg as la
+from scipy.optimize import curve_fit, least_squares, minimize
+
+from .cubic import cubic_design
+from .decimation import decimate_points
+from .function_optimizer import OptimizationResult
+
+FIT_METHODS = ['auto', 'vectorized', 'curve_fit', 'ransac']
+
+# Default decimation bound for the decoders, as a fraction of the y range
+DECIMATE_TOLERANCE = 0.002
+
+
+def cubic_function(x, a, b, c, d):
+    """Vectorized target function"""
+    return (a * np.power(x, 3) + b * np.power(x, 2) + c * x + d) / 4
+
+
+def _linear(x, a, b):
+    return a * x + b
+
+
+def _exponential(x, a, b, c):
+    return a * np.exp(b * x) + c
+
+
+def _logarithmic(x, a, b, c, d):
+    return a * np.log(np.abs(b * x + c)) + d
+
+
+def _rational(x, a, b, c, d):
+    return (a * x + b) / (c * x + d)
+
+
+def _trigonometric(x, a, b, c, d):
+    return a * np.sin(b * x + c) + d
+
+
+class FitCancelled(Exception):
+    """Raised from inside an objective to unwind the optimizer when a job must stop"""
+
+
+class FitJob:
+    """Cancellation flag plus wall-clock and evaluation budget for one fit
+
+    Objectives call check() before every evaluation, so cancel() or an
+    exhausted budget stops the optimizer at its next evaluation. The
+    fitter then returns the best parameters it has seen.
+    """
+
+    def __init__(self, time_budget=None, max_evaluations=None):
+        self.time_budget = time_budget
+        self.max_evaluations = max_evaluations
+        self.started = time.perf_counter()
+        self.evaluations = 0
+        self.stop_reason = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def stopped(self):
+        return self.stop_reason is not None
+
+    def check(self):
+        """Count one evaluation, raising FitCancelled once the job has to stop"""
+        with self._lock:
+            if self.stop_reason is None:
+                if self._cancelled.is_set():
+                    self.stop_reason = 'cancelled'
+                elif self.time_budget is not None and time.perf_counter() - self.started > self.time_budget:
+                    self.stop_reason = 'timeout'
+                elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+                    self.stop_reason = 'evaluation budget'
+            if self.stop_reason is not None:
+                raise FitCancelled(self.stop_reason)
+            self.evaluations += 1
+
+
+class _Tracked:
+    """Objective wrapper that enforces a job and remembers the best parameters seen"""
+
+    def __init__(self, func, job=None, value=lambda out: out):
+        self.func = func
+        self.job = job
+        self.value = value
+        self.best_value = np.inf
+        self.best_params = None
+
+    def __call__(self, params):
+        if self.job is not None:
+            self.job.check()
+        out = self.func(params)
+        value = self.value(out)
+        if value < self.best_value:
+            self.best_value, self.best_params = value, np.array(params, dtype=float)
+        return out
+
+
+def _linear_jacobian(x, a, b):
+    return np.column_stack([x, np.ones_like(x)])
+
+
+def _exponential_jacobian(x, a, b, c):
+    e = np.exp(b * x)
+    return np.column_stack([e, a * x * e, np.ones_like(x)])
+
+
+def _logarithmic_jacobian(x, a, b, c, d):
+    u = b * x + c
+    return np.column_stack([np.log(np.abs(u)), a * x / u, a / u, np.ones_like(x)])
+
+
+def _rational_jacobian(x, a, b, c, d):
+    den = c * x + d
+    ratio = (a * x + b) / den**2
+    return np.column_stack([x / den, 1 / den, -ratio * x, -ratio])
+
+
+def _trigonometric_jacobian(x, a, b, c, d):
+    phase = b * x + c
+    cos = np.cos(phase)
+    return np.column_stack([np.sin(phase), a * x * cos, a * cos, np.ones_like(x)])
+
+
+def _lstsq(columns, y, weights=None):
+    """Least-squares coefficients and (weighted) residual sum of squares for a linear model"""
+    A = np.column_stack(columns)
+    if weights is not None:
+        # Scaling rows by sqrt(w) turns weighted least squares into ordinary least squares
+        root = np.sqrt(weights)
+        A, y = A * root[:, None], y * root
+    coef = la.lstsq(A, y, rcond=None)[0]
+    return coef, float(np.sum((A @ coef - y) ** 2))
+
+
+def _unique_mean(x, y):
+    """Sorted unique x with y averaged over duplicates, as contour points often repeat x"""
+    ux, inverse = np.unique(x, return_inverse=True)
+    return ux, np.bincount(inverse, weights=y) / np.bincount(inverse)
+
+
+def _seed_cubic(x, y, weights=None, job=None):
+    return _lstsq([x**3, x**2, x, np.ones_like(x)], y, weights)[0] / 4
+
+
+def _seed_linear(x, y, weights=None, job=None):
+    return _lstsq([x, np.ones_like(x)], y, weights)[0]
+
+
+def _seed_exponential(x, y, weights=None, job=None):
+    # y' = a b e^(bx), so log|y'| is linear in x with slope b; a and c are then linear
+    ux, uy = _unique_mean(x, y)
+    if len(ux) < 4:
+        return None
+    slope = np.gradient(uy, ux)
+    valid = np.abs(slope) > 1e-12
+    if np.count_nonzero(valid) < 2:
+        return None
+    b = _lstsq([ux[valid], np.ones(np.count_nonzero(valid))], np.log(np.abs(slope[valid])))[0][0]
+    if not np.isfinite(b):
+        return None
+    # Step-like data gives a huge slope; keep e^(bx) within e^50 so the linear solve stays finite
+    limit = 50 / max(float(np.max(np.abs(x))), 1e-12)
+    b = float(np.clip(b, -limit, limit))
+    (a, c), _ = _lstsq([np.exp(b * x), np.ones_like(x)], y, weights)
+    return np.array([a, b, c])
+
+
+def _seed_logarithmic(x, y, weights=None, job=None):
+    # For a fixed pole position the model a*ln|x - pole| + d is linear; try poles
+    # on either side of the data and inside it, where ln|.| is two-sided
+    lo, hi = np.min(x), np.max(x)
+    span = max(hi - lo, 1e-9)
+    offsets = span * np.array([0.01, 0.1, 0.5, 1.0, 2.0])
+    poles = np.concatenate([lo - offsets, hi + offsets, np.linspace(lo, hi, 33)[1:-1]])
+    best = None
+    for pole in poles:
+        # Each pole is a full pass over the points, so a stopped job ends the search here
+        if job is not None:
+            job.check()
+        if np.min(np.abs(x - pole)) < 1e-9:
+            continue
+        coef, rss = _lstsq([np.log(np.abs(x - pole)), np.ones_like(x)], y, weights)
+        if best is None or rss < best[1]:
+            best = (np.array([coef[0], 1.0, -pole, coef[1]]), rss)
+    return best[0]
+
+
+def _seed_rational(x, y, weights=None, job=None):
+    # With d = 1, y (c x + 1) = a x + b rearranges to y = a x + b - c x y
+    (a, b, c), _ = _lstsq([x, np.ones_like(x), -x * y], y, weights)
+    return np.array([a, b, c, 1.0])
+
+
+def _seed_trigonometric(x, y, weights=None, job=None):
+    # Dominant frequency from the spectrum of a uniform resampling, then a linear fit
+    ux, uy = _unique_mean(x, y)
+    if len(ux) < 4:
+        return None
+    grid = np.linspace(ux[0], ux[-1], 512)
+    spectrum = np.abs(np.fft.rfft(np.interp(grid, ux, uy) - np.mean(uy)))
+    cycles = max(int(np.argmax(spectrum[1:])) + 1, 1)
+    b = 2 * np.pi * cycles / max(ux[-1] - ux[0], 1e-9)
+    (A, B, d), _ = _lstsq([np.sin(b * x), np.cos(b * x), np.ones_like(x)], y, weights)
+    return np.array([np.hypot(A, B), b, np.arctan2(B, A), d])
+
+
+@dataclass
+class FitFamily:
+    name: str
+    function: Callable
+    jacobian: Callable  # (n, k) derivatives of function with respect to its parameters
+    seed: Callable  # (x, y, weights, job) -> initial parameters, or None
+    label: str
+
+
+FIT_FAMILIES = {
+    'cubic': FitFamily('cubic', cubic_function, lambda x, *p: cubic_design(x), _seed_cubic,
+                       '({0:.3f}x³ + {1:.3f}x² + {2:.3f}x + {3:.3f})/4'),
+    'linear': FitFamily('linear', _linear, _linear_jacobian, _seed_linear, '{0:.3f}x + {1:.3f}'),
+    'exponential': FitFamily('exponential', _exponential, _exponential_jacobian, _seed_exponential,
+                             '{0:.3f} * e^({1:.3f}x) + {2:.3f}'),
+    'logarithmic': FitFamily('logarithmic', _logarithmic, _logarithmic_jacobian, _seed_logarithmic,
+                             '{0:.3f} * ln(|{1:.3f}x + {2:.3f}|) + {3:.3f}'),
+    'rational': FitFamily('rational', _rational, _rational_jacobian, _seed_rational,
+                          '({0:.3f}x + {1:.3f})/({2:.3f}x + {3:.3f})'),
+    'trigonometric': FitFamily('trigonometric', _trigonometric, _trigonometric_jacobian,
+                               _seed_trigonometric, '{0:.3f} * sin({1:.3f}x + {2:.3f}) + {3:.3f}'),
+}
+
+
+def evaluate_function(function_type, x, params):
+    """Values of a fitted family at x"""
+    with np.errstate(all='ignore'):
+        return FIT_FAMILIES[function_type].function(x, *params)
+
+
+def format_function(function_type, params):
+    """Display string for a fitted family"""
+    return f"f(x) = {FIT_FAMILIES[function_type].label.format(*params)}"
+
+
+def information_criterion(rss, n, k, criterion='bic'):
+    """AIC or BIC of a least-squares fit with Gaussian errors"""
+    fit = n * np.log(max(rss, 1e-300) / n)
+    return fit + (2 * k if criterion == 'aic' else k * np.log(n))
+
+
+class _FamilyFit:
+    """Refinement state of one family during model selection"""
+
+    def __init__(self, family, x, y, job=None, weights=None):
+        self.family = family
+        self.job = job
+        self.x = x
+        self.y = y
+        # Residual rows are scaled by sqrt(w), so the sum of squares is weighted
+        self.root_weights = np.sqrt(weights) if weights is not None else None
+        # Seeding costs full passes over the points, so it honours the job like refinement does
+        try:
+            if job is not None:
+                job.check()
+            self.params = family.seed(x, y, weights, job)
+        except FitCancelled:
+            self.params = None
+        except (ValueError, la.LinAlgError, FloatingPointError):
+            # A seed that breaks down numerically drops its family, not the whole selection
+            self.params = None
+        self.rss = self._rss(self.params) if self.params is not None else np.inf
+        self.score = np.inf
+        self.improvement = np.inf
+        self.converged = self.params is None or (job is not None and job.stopped)
+        self.evaluations = 0
+
+    def _residuals(self, params):
+        residuals = evaluate_function(self.family.name, self.x, params) - self.y
+        if self.root_weights is not None:
+            residuals = residuals * self.root_weights
+        # Poles and overflow would stop the solver; a large finite residual steers it away
+        return np.nan_to_num(residuals, nan=1e6, posinf=1e6, neginf=-1e6)
+
+    def _jacobian(self, params):
+        with np.errstate(all='ignore'):
+            jacobian = self.family.jacobian(self.x, *params)
+            if self.root_weights is not None:
+                jacobian = jacobian * self.root_weights[:, None]
+        # Clamped residuals do not move with the parameters
+        return np.nan_to_num(jacobian, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def _rss(self, params):
+        return float(np.sum(self._residuals(params) ** 2))
+
+    def refine(self, max_nfev):
+        """One bounded round of trust-region refinement from the current parameters"""
+        residuals = _Tracked(self._residuals, self.job, value=lambda r: float(np.sum(r ** 2)))
+        try:
+            result = least_squares(residuals, self.params, jac=self._jacobian, max_nfev=max_nfev)
+            self.evaluations += result.nfev + result.njev
+            self.converged = result.status != 0
+        except FitCancelled:
+            self.converged = True
+        except (ValueError, la.LinAlgError):
+            self.converged = True
+            return self
+        # Keep the best point evaluated, which also covers rounds cut short
+        if residuals.best_value < self.rss:
+            self.params, self.rss = residuals.best_params, residuals.best_value
+        return self
+
+
+class CurveFitter:
+    """Fits extracted graph points without any GUI dependency"""
+
+    def __init__(self, method='auto', families=None, criterion='bic', round_evals=40,
+                 max_rounds=10, drop_margin=10.0, ransac_hypotheses=2000, ransac_threshold=None,
+                 decimate_tolerance=None, decimate_min_points=1000, rng=None):
+        if method not in FIT_METHODS:
+            raise ValueError(f"Unknown fitting method: {method}")
+        self.method = method
+        self.families = list(families or FIT_FAMILIES)
+        self.criterion = criterion
+        # Function evaluations per family between early-stopping checks
+        self.round_evals = round_evals
+        self.max_rounds = max_rounds
+        # Information criterion gap that marks a family as clearly losing
+        self.drop_margin = drop_margin
+        # Final score of every family in the last model selection, None if dropped or failed
+        self.scores = {}
+        # Objective, gradient and Jacobian evaluations spent by the last fit
+        self.evaluations = 0
+        # Upper bound on RANSAC hypotheses; fewer are drawn once enough inliers are seen
+        self.ransac_hypotheses = ransac_hypotheses
+        # Inlier distance in y; None uses 2% of the central 90% range of y
+        self.ransac_threshold = ransac_threshold
+        # Decimation bound as a fraction of the y range; None fits every point. RANSAC
+        # never decimates: column means would blend outliers into the curve
+        self.decimate_tolerance = decimate_tolerance
+        self.decimate_min_points = decimate_min_points
+        # DecimatedPoints used by the last fit, None if it saw the full point set
+        self.decimation = None
+        self.rng = rng or np.random.default_rng()
+
+    def vectorized_optimization(self, x, y, critical_points=None, job=None, weights=None):
+        """Optimized vectorized parameter estimation"""
+        # Create design matrix for cubic function
+        X = np.vstack([x**3, x**2, x, np.ones_like(x)]).T
+        w = np.ones_like(x) if weights is None else weights
+        root = np.sqrt(w)
+        X, y_scaled = X * root[:, None], y * root
+
+        # Use SVD for stable solution
+        U, S, Vh = la.svd(X, full_matrices=False)
+
+        # Calculate parameters using pseudo-inverse
+        params = Vh.T @ (1/S * (U.T @ y_scaled))
+        params = params / 4  # Scale parameters
+
+        # Refine using L-BFGS-B if critical points are available
+        if critical_points:
+            # The cubic is linear in p, so predictions are matrix products and
+            # every critical point is handled as one row of C
+            A = cubic_design(x)
+            C = cubic_design(np.array([px for _, px, _ in critical_points], dtype=float))
+            cy = np.array([py for _, _, py in critical_points], dtype=float)
+
+            total = np.sum(w)
+
+            def objective(p):
+                residual = A @ p - y
+                critical = C @ p - cy
+                value = np.sum(w * residual**2) / total + 0.1 * np.sum(np.abs(critical))
+                gradient = 2 * A.T @ (w * residual) / total + 0.1 * C.T @ np.sign(critical)
+                return value, gradient
+
+            tracked = _Tracked(objective, job, value=lambda out: out[0])
+            try:
+                result = minimize(tracked, params, jac=True, method='L-BFGS-B')
+                params = result.x
+                self.evaluations += result.nfev
+            except FitCancelled:
+                self.evaluations += job.evaluations
+                if tracked.best_params is not None:
+                    params = tracked.best_params
+
+        return params
+
+    def curve_fit_optimization(self, x, y, critical_points=None, job=None, weights=None):
+        """Optimization using scipy's curve_fit"""
+        # Get initial parameter estimates
+        p0 = self.vectorized_optimization(x, y, weights=weights)
+        w = np.ones_like(x) if weights is None else weights
+        # curve_fit minimizes sum(((f - y) / sigma)^2), so sigma = 1/sqrt(w) weights the points
+        sigma = None if weights is None else 1 / np.sqrt(weights)
+
+        model = _Tracked(lambda p: cubic_function(x, *p), job,
+                         value=lambda pred: float(np.sum(w * (pred - y)**2)))
+
+        # Perform curve fitting with the exact Jacobian instead of finite differences
+        try:
+            params, _, info, _, _ = curve_fit(lambda x, *p: model(p), x, y, p0=p0, sigma=sigma,
+                                              maxfev=1000, jac=lambda x, *p: cubic_design(x),
+                                              full_output=True)
+            self.evaluations += info['nfev'] + info.get('njev', 0)
+        except FitCancelled:
+            self.evaluations += job.evaluations
+            params = model.best_params if model.best_params is not None else p0
+
+        return params
+
+    def ransac_optimization(self, x, y, critical_points=None, job=None, batch_size=500,
+                            confidence=0.999, weights=None):
+        """Robust cubic fit that ignores grid-line and label pixels
+
+        Minimal samples of four points with distinct x each define one
+        cubic exactly; a whole batch of them is solved in a single stacked
+        np.linalg.solve and scored against every point at once. The
+        hypothesis with the most inliers (lowest inlier error on ties) is
+        refit by least squares on its consensus set. Sampling stops early
+        once the observed inlier ratio makes a clean sample near certain.
+        With weights, points are sampled in proportion to their weight and
+        inliers count by weight, as if the full point set were used.
+        """
+        A = cubic_design(x)
+        n = len(x)
+        if n < 4:
+            return _lstsq([A], y, weights)[0]
+        w = np.ones_like(x) if weights is None else weights
+        total = np.sum(w)
+        probabilities = None if weights is None else w / total
+
+        threshold = self.ransac_threshold
+        if threshold is None:
+            low, high = np.percentile(y, [5, 95])
+            threshold = max(0.02 * (high - low), 1e-9)
+
+        best, best_count, best_rss = None, -1, np.inf
+        required = self.ransac_hypotheses
+        drawn = 0
+        try:
+            while drawn < min(required, self.ransac_hypotheses):
+                if job is not None:
+                    job.check()
+                count = min(batch_size, self.ransac_hypotheses - drawn)
+                drawn += count
+                self.evaluations += count
+
+                # Four distinct x values make the cubic's Vandermonde system non-singular
+                if probabilities is None:
+                    samples = self.rng.integers(0, n, (count, 4))
+                else:
+                    samples = self.rng.choice(n, (count, 4), p=probabilities)
+                sorted_x = np.sort(x[samples], axis=1)
+                samples = samples[np.all(np.diff(sorted_x, axis=1) > 1e-12, axis=1)]
+                if not len(samples):
+                    continue
+                params = np.linalg.solve(A[samples], y[samples][..., None])[..., 0]
+
+                # (points, hypotheses) residuals scored in one pass
+                residuals = np.abs(A @ params.T - y[:, None])
+                inliers = residuals < threshold
+                counts = w @ inliers
+                rss = w @ np.where(inliers, residuals ** 2, 0)
+                i = np.lexsort((rss, -counts))[0]
+                if counts[i] > best_count or (counts[i] == best_count and rss[i] < best_rss):
+                    best, best_count, best_rss = params[i], counts[i], rss[i]
+
+                ratio = best_count / total
+                if ratio >= 1:
+                    break
+                # A small ratio makes log1p(-ratio**4) round to 0: no early stop then
+                clean = np.log1p(-ratio ** 4)
+                if ratio > 0 and np.isfinite(clean) and clean < 0:
+                    required = int(min(np.ceil(np.log(1 - confidence) / clean), self.ransac_hypotheses))
+        except FitCancelled:
+            pass
+
+        if best is None:
+            return _lstsq([A], y, weights)[0]
+
+        # Refit on the consensus set, then once more on the refit's own inliers
+        params = best
+        for _ in range(2):
+            mask = np.abs(A @ params - y) < threshold
+            if np.count_nonzero(mask) < 4:
+                break
+            params = _lstsq([A[mask]], y[mask], None if weights is None else w[mask])[0]
+        return params
+
+    def select_model(self, x, y, job=None, weights=None):
+        """Fit every family concurrently and keep the best by information criterion
+
+        Each family starts from its linearized closed-form seed and is
+        refined in rounds of round_evals evaluations on a thread pool.
+        After each round, a family trailing the leader by more than
+        drop_margin that gained less than that gap in its last round is
+        dropped, so hopeless families stop costing time early. A stopped
+        job ends the rounds and the best family so far wins. Weights count
+        towards the sample size of the information criterion.
+        """
+        n = len(x) if weights is None else float(np.sum(weights))
+        scores = {name: None for name in self.families}
+
+        with ThreadPoolExecutor(max_workers=len(self.families)) as executor:
+            fits = list(executor.map(lambda name: _FamilyFit(FIT_FAMILIES[name], x, y, job, weights),
+                                     self.families))
+            active = [fit for fit in fits if fit.params is not None]
+            if not active:
+                # Stopped before any family had a seed: the closed-form cubic still gives an answer
+                self.scores = scores
+                return OptimizationResult(_seed_cubic(x, y, weights), 0.0, 'cubic', 0)
+            for fit in active:
+                fit.score = information_criterion(fit.rss, n, len(fit.params), self.criterion)
+
+            for _ in range(self.max_rounds):
+                refining = [fit for fit in active if not fit.converged]
+                if not refining or (job is not None and job.stopped):
+                    break
+                for fit in executor.map(lambda fit: fit.refine(self.round_evals), refining):
+                    score = information_criterion(fit.rss, n, len(fit.params), self.criterion)
+                    fit.improvement = fit.score - score
+                    fit.score = score
+
+                best = min(fit.score for fit in active)
+                active = [fit for fit in active
+                          if fit.score - best <= self.drop_margin
+                          or fit.improvement >= fit.score - best]
+
+        for fit in active:
+            scores[fit.family.name] = float(fit.score)
+        self.scores = scores
+        self.evaluations += sum(fit.evaluations for fit in fits)
+
+        winner = min(active, key=lambda fit: fit.score)
+        return OptimizationResult(winner.params, winner.rss / n, winner.family.name, 0)
+
+    def decimate(self, x, y):
+        """Weighted representatives of the points, or None when decimation is off or not worth it"""
+        if self.decimate_tolerance is None or len(x) < self.decimate_min_points or self.method == 'ransac':
+            return None
+        tolerance = self.decimate_tolerance * max(float(np.ptp(y)), 1e-12)
+        return decimate_points(x, y, tolerance)
+
+    def fit(self, points, critical_points=None, job=None, weights=None):
+        """Fit (n, 2) graph points with the configured method
+
+        weights give each point's multiplicity. Without them and with
+        decimate_tolerance set, large point sets are first reduced to
+        weighted representatives, so the fit cost follows the curve's
+        shape rather than the image resolution; the reported error is
+        still measured on every original point. Decimation keeps the
+        least-squares fit but averages outliers into the curve, so the
+        'ransac' method always sees every point.
+
+        With a FitJob, the fit stops early on cancel() or when the job's
+        budget runs out, returning the best parameters found so far with
+        the job's stop reason.
+        """
+        x = points[:, 0]
+        y = points[:, 1]
+        started = time.perf_counter()
+        self.evaluations = 0
+
+        self.decimation = self.decimate(x, y) if weights is None else None
+        if self.decimation is not None:
+            fit_x, fit_y, fit_weights = self.decimation.x, self.decimation.y, self.decimation.weights
+        else:
+            fit_x, fit_y, fit_weights = x, y, weights
+
+        if self.method == 'auto':
+            result = self.select_model(fit_x, fit_y, job, fit_weights)
+        else:
+            if self.method == 'vectorized':
+                params = self.vectorized_optimization(fit_x, fit_y, critical_points, job, fit_weights)
+            elif self.method == 'ransac':
+                params = self.ransac_optimization(fit_x, fit_y, critical_points, job, weights=fit_weights)
+            else:
+                params = self.curve_fit_optimization(fit_x, fit_y, critical_points, job, fit_weights)
+            result = OptimizationResult(params, 0.0, "cubic", 0)
+
+        # Error over the caller's points, clamped at poles like the family residuals
+        residuals = np.nan_to_num(evaluate_function(result.function_type, x, result.params) - y,
+                                  nan=1e6, posinf=1e6, neginf=-1e6)
+        result.error = float(np.average(residuals**2, weights=weights))
+
+        result.evaluations = self.evaluations
+        result.elapsed = time.perf_counter() - started
+        result.stop_reason = job.stop_reason if job is not None else None
+        return result
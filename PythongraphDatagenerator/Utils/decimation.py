@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class DecimatedPoints:
+    x: np.ndarray
+    y: np.ndarray
+    weights: np.ndarray  # Number of original points each representative stands for
+    max_deviation: float  # Largest distance in y between a column mean and its representative
+    source_count: int
+
+    @property
+    def points(self):
+        return np.column_stack([self.x, self.y])
+
+
+def _bin_stats(x, y, w, starts, stops):
+    """Weighted mean x and y, total weight and max deviation from the mean y of index ranges"""
+    cw = np.concatenate([[0.0], np.cumsum(w)])
+    cx = np.concatenate([[0.0], np.cumsum(w * x)])
+    cy = np.concatenate([[0.0], np.cumsum(w * y)])
+    weights = cw[stops] - cw[starts]
+    mean_x = (cx[stops] - cx[starts]) / weights
+    mean_y = (cy[stops] - cy[starts]) / weights
+    # y is only sorted by x, so extremes need a per-range reduction
+    y_max = np.maximum.reduceat(y, starts)
+    y_min = np.minimum.reduceat(y, starts)
+    deviation = np.maximum(y_max - mean_y, mean_y - y_min)
+    return mean_x, mean_y, weights, deviation
+
+
+def decimate_points(x, y, tolerance, bins=64):
+    """Weighted representatives of points, each within tolerance of the column means it replaces
+
+    Points sharing an x value (a stroke several pixels thick) are first
+    merged into their mean, which leaves every least-squares objective
+    unchanged up to a constant. Individual points are not bounded: an
+    outlier sharing a column with the curve is averaged into it, so the
+    result suits least-squares fits only, not robust ones like RANSAC. The columns are then binned uniformly in
+    x and each bin becomes one point at its weighted mean; bins in which
+    a column mean lies farther than tolerance from the bin's mean are
+    halved in x, all at once per pass, until every bin meets the
+    tolerance. The number of points left follows the curve's shape and
+    the tolerance instead of the image resolution.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) == 0:
+        return DecimatedPoints(x, y, np.empty(0), 0.0, 0)
+
+    # Sorted distinct x with the mean y and multiplicity of each
+    x_col, inverse = np.unique(x, return_inverse=True)
+    w_col = np.bincount(inverse).astype(float)
+    y_col = np.bincount(inverse, weights=y) / w_col
+    n = len(x_col)
+
+    edges = np.linspace(x_col[0], x_col[-1], bins + 1)
+    starts = np.unique(np.searchsorted(x_col, edges[:-1], side='left'))
+    stops = np.append(starts[1:], n)
+
+    while True:
+        mean_x, mean_y, weights, deviation = _bin_stats(x_col, y_col, w_col, starts, stops)
+        split = (deviation > tolerance) & (stops - starts > 1)
+        if not split.any():
+            break
+
+        # Cut each offending range at the middle of its x extent, keeping both halves non-empty
+        lo, hi = x_col[starts[split]], x_col[stops[split] - 1]
+        middle = np.searchsorted(x_col, 0.5 * (lo + hi), side='right')
+        middle = np.clip(middle, starts[split] + 1, stops[split] - 1)
+        starts = np.sort(np.concatenate([starts, middle]))
+        stops = np.append(starts[1:], n)
+
+    return DecimatedPoints(mean_x, mean_y, weights, float(deviation.max()), len(x))
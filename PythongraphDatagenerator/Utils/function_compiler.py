@@ -0,0 +1,60 @@
+import numpy as np
+import sympy as sp
+
+
+class CompiledFunction:
+    """NumPy-vectorized evaluator for a sympy expression of one variable"""
+
+    def __init__(self, expr, symbol, max_abs=None, pole_tolerance=1e-10):
+        self.expr = expr
+        self.symbol = symbol
+        self.max_abs = max_abs
+        self.pole_tolerance = pole_tolerance
+
+        # Compile the expression once instead of calling subs per point
+        self._func = sp.lambdify(symbol, expr, modules='numpy')
+
+        # Compile the denominator so poles can be masked as an array operation
+        _, denominator = sp.fraction(sp.together(expr))
+        self._denominator = None
+        if denominator.has(symbol):
+            self._denominator = sp.lambdify(symbol, denominator, modules='numpy')
+
+    def __call__(self, x):
+        """Evaluate at a scalar or array, returning NaN where undefined"""
+        x_arr = np.asarray(x, dtype=float)
+
+        with np.errstate(all='ignore'):
+            y = np.asarray(self._func(x_arr))
+            if np.iscomplexobj(y):
+                y = np.where(np.imag(y) == 0, np.real(y), np.nan)
+            # Constant expressions come back as a scalar
+            y = np.broadcast_to(y, x_arr.shape).astype(float)
+
+            invalid = ~np.isfinite(y)
+            if self.max_abs is not None:
+                invalid |= np.abs(y) > self.max_abs
+            if self._denominator is not None:
+                denominator = np.broadcast_to(self._denominator(x_arr), x_arr.shape)
+                invalid |= np.abs(denominator) < self.pole_tolerance
+
+        y = np.where(invalid, np.nan, y)
+
+        if y.ndim == 0:
+            return float(y)
+        return y
+
+    def derivative(self, order=1):
+        """Compile the n-th derivative with the same masking rules"""
+        # Differentiate over the reals so Abs() becomes sign() instead of re/im terms
+        real = sp.Dummy('x', real=True)
+        derivative = sp.diff(self.expr.subs(self.symbol, real), real, order)
+        return CompiledFunction(
+            derivative.subs(real, self.symbol), self.symbol,
+            max_abs=self.max_abs, pole_tolerance=self.pole_tolerance
+        )
+
+
+def compile_function(expr, symbol, max_abs=None):
+    """Compile a sympy expression into a vectorized NaN-masked callable"""
+    return CompiledFunction(expr, symbol, max_abs=max_abs)
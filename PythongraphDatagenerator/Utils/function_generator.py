@@ -0,0 +1,203 @@
+import random
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import sympy as sp
+
+from .adaptive_sampling import adaptive_sample
+from .critical_points import analyze_critical_points
+from .function_templates import (BoundTemplate, FunctionTemplate, TYPE_TEMPLATES, get_template,
+                                 sample_parameters)
+from .point_io import save_points_npz_stream, write_points_json
+from .segmentation import SegmentTracker
+
+FUNCTION_TYPES = [
+    'logarithmic',
+    'exponential',
+    'rational',
+    'trigonometric',
+    'linear'
+]
+
+
+@dataclass
+class GeneratedFunction:
+    function_type: str
+    label: str
+    template: FunctionTemplate
+    params: tuple
+    symbol: sp.Symbol
+    func: BoundTemplate
+
+    @cached_property
+    def expr(self):
+        """Concrete sympy expression, only built when something asks for it"""
+        return self.template.instantiate(self.params)
+
+
+@dataclass
+class FunctionBatch:
+    """Many instances of one template as a parameter matrix"""
+    template: FunctionTemplate
+    params: np.ndarray
+
+    def __len__(self):
+        return len(self.params)
+
+    def evaluate(self, x):
+        """(functions, points) matrix of values, NaN where undefined"""
+        return self.template.evaluate(self.params, x)
+
+    def labels(self):
+        return [self.template.label(row) for row in self.params]
+
+    def instance(self, index):
+        """A single row as a GeneratedFunction"""
+        return _instance(self.template, self.params[index])
+
+
+def _instance(template, values):
+    values = tuple(float(v) for v in values)
+    return GeneratedFunction(template.function_type, template.label(values), template, values,
+                             template.symbol, template.bind(values))
+
+
+class FunctionGenerator:
+    """Random function generation without any GUI dependency"""
+
+    def __init__(self, rng=None, solve_timeout=2.0):
+        self.function_types = list(FUNCTION_TYPES)
+        # random.Random(seed) or np.random.Generator; a private stream by default so
+        # nothing else drawing from the global random state shifts the functions
+        self.rng = rng or random.Random()
+        # Seconds sympy may spend before the numeric engine takes over
+        self.solve_timeout = solve_timeout
+
+    def generate(self, func_type):
+        """Build a random function of the given type from its cached template"""
+        if func_type not in TYPE_TEMPLATES:
+            raise ValueError(f"Unknown function type: {func_type}")
+        uniform = self.rng.uniform
+
+        a = round(uniform(0.5, 2), 2)
+        b = round(uniform(-2, 2), 2)
+        c = round(uniform(-2, 2), 2)
+
+        if func_type in ('logarithmic', 'rational'):
+            d = round(uniform(-2, 2), 2)
+            name, values = func_type, (a, b, c, d)
+        elif func_type == 'trigonometric':
+            name, values = self.rng.choice(['sin', 'cos', 'tan']), (a, b, c)
+        elif func_type == 'exponential':
+            name, values = func_type, (a, b, c)
+        else:
+            name, values = func_type, (a, b)
+
+        return _instance(get_template(name), values)
+
+    def generate_batch(self, func_type, count):
+        """count random functions of one type as parameter matrices, one batch per template
+
+        Nothing symbolic happens per instance: the constants are sampled as
+        a matrix and evaluated through the type's cached templates.
+        """
+        if func_type not in TYPE_TEMPLATES:
+            raise ValueError(f"Unknown function type: {func_type}")
+        if isinstance(self.rng, np.random.Generator):
+            rng = self.rng
+        else:
+            rng = np.random.default_rng(self.rng.getrandbits(64))
+        names = TYPE_TEMPLATES[func_type]
+        counts = rng.multinomial(count, [1 / len(names)] * len(names))
+        return [FunctionBatch(get_template(name), sample_parameters(name, n, rng))
+                for name, n in zip(names, counts) if n]
+
+    def find_critical_points(self, generated, x_range):
+        """Structured intercepts and local extrema within x_range"""
+        return analyze_critical_points(generated.expr, generated.symbol, tuple(x_range),
+                                       timeout=self.solve_timeout, func=generated.func)
+
+    def sample_segments(self, generated, x_range, step, tolerance=None):
+        """Sampled points without undefined values, plus [start, stop) of each continuous segment"""
+        tracker = SegmentTracker()
+        chunks = list(tracker.track(self._iter_raw_chunks(generated, x_range, step, None, tolerance)))
+        if not chunks:
+            return np.empty(0), np.empty(0), []
+        x, y = (np.concatenate(axis) for axis in zip(*chunks))
+        return x, y, tracker.segments
+
+    def sample_points(self, generated, x_range, step, tolerance=None):
+        """Evaluate on a uniform grid (or adaptively within tolerance), dropping undefined points"""
+        x, y, _ = self.sample_segments(generated, x_range, step, tolerance)
+        return x, y
+
+    def _iter_raw_chunks(self, generated, x_range, step, chunk_size=65536, tolerance=None):
+        """Yield (x, y) chunks of the sampling grid, NaN where the function is undefined"""
+        if tolerance is not None:
+            # Adaptive sampling is already capped in size, so it is a single chunk
+            yield adaptive_sample(generated.func, x_range, tolerance)
+            return
+
+        start = x_range[0]
+        stop = x_range[1] + step
+        total = max(int(np.ceil((stop - start) / step)), 0)
+        # np.arange fills start + i * delta with delta taken from its first two values
+        delta = (start + step) - start
+        chunk_size = chunk_size or max(total, 1)
+
+        for offset in range(0, total, chunk_size):
+            x = start + np.arange(offset, min(offset + chunk_size, total)) * delta
+            yield x, generated.func(x)
+
+    def iter_point_chunks(self, generated, x_range, step, chunk_size=65536, tolerance=None):
+        """Yield the sample_points grid as (x, y) chunks of at most chunk_size points"""
+        for x, y in self._iter_raw_chunks(generated, x_range, step, chunk_size, tolerance):
+            mask = np.isfinite(y)
+            yield x[mask], y[mask]
+
+    def export_metadata(self, generated, x_range, step, tolerance=None):
+        """Descriptive fields stored alongside exported points"""
+        metadata = {
+            'function_type': generated.function_type,
+            'label': generated.label,
+            'x_range': list(x_range),
+            'step_size': step if tolerance is None else None
+        }
+        if tolerance is not None:
+            metadata['tolerance'] = tolerance
+        metadata['critical_points'] = self.find_critical_points(generated, x_range).to_dict()
+        return metadata
+
+    def _with_points(self, metadata, points, segments):
+        """Export record with points and segments placed just before the critical points"""
+        record = {key: value for key, value in metadata.items() if key != 'critical_points'}
+        record['points'] = points
+        record['segments'] = segments
+        record['critical_points'] = metadata['critical_points']
+        return record
+
+    def export_record(self, generated, x_range, step, tolerance=None):
+        """Exportable dict of sampled points, their continuous segments and critical points"""
+        x, y, segments = self.sample_segments(generated, x_range, step, tolerance)
+        points = [{'x': float(xi), 'y': float(yi)} for xi, yi in zip(x, y)]
+        metadata = self.export_metadata(generated, x_range, step, tolerance)
+        return self._with_points(metadata, points, segments)
+
+    def export_json(self, generated, x_range, step, path, chunk_size=65536, tolerance=None):
+        """Stream the export record to a JSON file, returning the point count"""
+        tracker = SegmentTracker()
+        chunks = tracker.track(self._iter_raw_chunks(generated, x_range, step, chunk_size, tolerance))
+        metadata = self.export_metadata(generated, x_range, step, tolerance)
+        # Segments are only known once the points have streamed past
+        record = self._with_points(metadata, None, lambda: tracker.segments)
+        return write_points_json(path, record, chunks)
+
+    def export_npz(self, generated, x_range, step, path, dtype=np.float64, chunk_size=65536,
+                   tolerance=None):
+        """Stream sampled points to the binary format, returning the point count"""
+        tracker = SegmentTracker()
+        chunks = tracker.track(self._iter_raw_chunks(generated, x_range, step, chunk_size, tolerance))
+        metadata = self.export_metadata(generated, x_range, step, tolerance)
+        return save_points_npz_stream(path, chunks, lambda: dict(metadata, segments=tracker.segments),
+                                      dtype=dtype)
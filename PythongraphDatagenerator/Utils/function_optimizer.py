@@ -1,16 +1,159 @@
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+import json
+import multiprocessing
+import os
 import queue
 import threading
 import time
 
+from .cubic import cubic_design
+
 @dataclass
 class OptimizationResult:
     params: np.ndarray
     error: float
     function_type: str
     generation: int
+    evaluations: int = 0
+    elapsed: float = 0.0
+    stop_reason: Optional[str] = None  # Why a run ended early, None when it finished
+
+# Critical point types that error_function penalizes; x-intercepts are pulled to y = 0
+_PENALIZED_POINTS = ('max', 'min', 'x_intercept', 'y_intercept')
+
+# Search engines optimize() can run, all scoring candidates through _Fitness
+OPTIMIZER_ENGINES = ['ga', 'cmaes', 'de']
+
+# Upper bound on population x points entries of one prediction block
+_BLOCK_ENTRIES = 2 ** 22
+
+# Bumped whenever the layout of checkpoint files changes
+_CHECKPOINT_VERSION = 1
+
+# Constructor settings an island worker rebuilds its optimizer from; no run state is sent
+_ISLAND_SETTINGS = ('max_attempts', 'population_size', 'mutation_rate', 'crossover_rate', 'elite_size',
+                    'batch_size', 'islands', 'migration_interval', 'migrants', 'engine',
+                    'differential_weight', 'initial_sigma', 'target_error', 'patience',
+                    'min_improvement', 'max_evaluations', 'time_budget', 'minibatch',
+                    'minibatch_patience', 'minibatch_max')
+
+
+def _get_state(obj, names, prefix=''):
+    """Attributes as arrays for np.savez; None is stored as an empty array"""
+    return {prefix + name: np.empty(0) if getattr(obj, name) is None else np.asarray(getattr(obj, name))
+            for name in names}
+
+
+def _set_state(obj, names, state, prefix=''):
+    """Inverse of _get_state"""
+    for name in names:
+        value = state[prefix + name]
+        if value.size == 0 and value.ndim > 0:
+            value = None
+        elif value.ndim == 0:
+            value = value.item()
+        setattr(obj, name, value)
+
+
+class _ProgressReporter:
+    """Puts OptimizationResults on a queue, throttled by time and by improvement
+    
+    A result is only sent when the error improved since the last one, and
+    then only once interval seconds have passed or the error fell by at
+    least the relative improvement. finish() always sends the final best
+    with the run's stop reason.
+    """
+    
+    def __init__(self, update_queue, interval, improvement):
+        self.update_queue = update_queue
+        self.interval = interval
+        self.improvement = improvement
+        self.reported_error = float('inf')
+        self.last_report = time.perf_counter()
+        self.pending = None
+    
+    def update(self, params, error, generation, evaluations=0):
+        if self.update_queue is None or params is None or not error < self.reported_error:
+            return
+        self.pending = (params.copy(), error, generation, evaluations)
+        now = time.perf_counter()
+        gain = (float('inf') if not np.isfinite(self.reported_error)
+                else (self.reported_error - error) / max(abs(self.reported_error), 1e-300))
+        if now - self.last_report >= self.interval or gain >= self.improvement:
+            self.flush()
+    
+    def flush(self):
+        if self.pending is None:
+            return
+        params, error, generation, evaluations = self.pending
+        self.update_queue.put(OptimizationResult(params=params, error=error, function_type="cubic",
+                                                 generation=generation, evaluations=evaluations))
+        self.reported_error = error
+        self.last_report = time.perf_counter()
+        self.pending = None
+    
+    def finish(self, params, error, generation, evaluations, stop_reason):
+        self.pending = None
+        if self.update_queue is not None and params is not None:
+            self.update_queue.put(OptimizationResult(params=params.copy(), error=error,
+                                                     function_type="cubic", generation=generation,
+                                                     evaluations=evaluations, stop_reason=stop_reason))
+
+
+class _Termination:
+    """Stopping rules of one run, checked after every generation
+    
+    A run stops when its best error reaches target_error, when the best
+    has not improved by min_improvement (relative) for patience
+    generations, or when it has used max_evaluations or time_budget
+    seconds. check() returns the reason, None while the run should go on.
+    A stall on a mini-batch grows the sample instead.
+    """
+    
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        self.started = time.perf_counter()
+        self.reference = float('inf')
+        self.stalled = 0
+    
+    def state(self):
+        return {'termination_reference': np.asarray(self.reference),
+                'termination_stalled': np.asarray(self.stalled),
+                'termination_elapsed': np.asarray(time.perf_counter() - self.started)}
+    
+    def load_state(self, state):
+        self.reference = float(state['termination_reference'])
+        self.stalled = int(state['termination_stalled'])
+        # The time budget counts time already spent before the checkpoint
+        self.started = time.perf_counter() - float(state['termination_elapsed'])
+    
+    def check(self, run):
+        optimizer = self.optimizer
+        if run.best_error <= optimizer.target_error:
+            return 'target error'
+        
+        if not np.isfinite(self.reference) or \
+                run.best_error < self.reference - optimizer.min_improvement * abs(self.reference):
+            self.reference = run.best_error
+            self.stalled = 0
+        else:
+            self.stalled += 1
+        
+        # A mini-batch run only converges once its sample has stopped growing
+        if self.stalled and self.stalled % optimizer.minibatch_patience == 0 and run.fitness.grow():
+            self.stalled = 0
+        elif optimizer.patience is not None and self.stalled >= optimizer.patience:
+            return 'converged'
+        
+        if optimizer.max_evaluations is not None and run.evaluations >= optimizer.max_evaluations:
+            return 'evaluation budget'
+        if optimizer.time_budget is not None and time.perf_counter() - self.started > optimizer.time_budget:
+            return 'timeout'
+        return None
+
 
 class FunctionOptimizer:
     def __init__(self, 
@@ -19,7 +162,28 @@ class FunctionOptimizer:
                  mutation_rate=0.1,
                  crossover_rate=0.7,
                  elite_size=2,
-                 batch_size=10):
+                 batch_size=10,
+                 report_interval=0.1,
+                 report_improvement=0.05,
+                 silent=False,
+                 islands=1,
+                 migration_interval=50,
+                 migrants=2,
+                 engine='ga',
+                 differential_weight=0.8,
+                 initial_sigma=2.5,
+                 target_error=1e-6,
+                 patience=200,
+                 min_improvement=1e-6,
+                 max_evaluations=None,
+                 time_budget=None,
+                 minibatch=None,
+                 minibatch_patience=20,
+                 minibatch_max=4096,
+                 checkpoint_interval=30.0,
+                 rng=None):
+        if engine not in OPTIMIZER_ENGINES:
+            raise ValueError(f"Unknown optimizer engine: {engine}")
         self.max_attempts = max_attempts
         self.population_size = population_size
         self.mutation_rate = mutation_rate
@@ -27,15 +191,54 @@ class FunctionOptimizer:
         self.elite_size = elite_size
         self.batch_size = batch_size
         self.learning_rate = 0.01
+        # Progress goes to update_queue only after an improvement, at most once per
+        # report_interval seconds unless the error dropped by report_improvement (relative)
+        self.report_interval = report_interval
+        self.report_improvement = report_improvement
+        # Batch jobs: no progress reports at all, only the return value
+        self.silent = silent
+        # Island model: independent populations in worker processes, passing their
+        # best `migrants` individuals around a ring every migration_interval generations
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        # 'ga' is the mutation-only GA; 'de' uses crossover_rate and differential_weight;
+        # 'cmaes' samples population_size candidates around a mean with step size initial_sigma
+        self.engine = engine
+        self.differential_weight = differential_weight
+        self.initial_sigma = initial_sigma
+        # Termination: see _Termination; patience=None never stops on a stall
+        self.target_error = target_error
+        self.patience = patience
+        self.min_improvement = min_improvement
+        self.max_evaluations = max_evaluations
+        self.time_budget = time_budget
+        # Mini-batch fitness: score generations on this many rotating random points,
+        # doubling the sample up to minibatch_max after minibatch_patience generations
+        # without progress
+        self.minibatch = minibatch
+        self.minibatch_patience = minibatch_patience
+        self.minibatch_max = minibatch_max
+        # Why the last optimize() stopped before max_attempts, None if it ran them all
+        self.stop_reason = None
+        # Seconds between checkpoint writes of optimize(checkpoint=...)
+        self.checkpoint_interval = checkpoint_interval
+        # Every random draw of a run comes from this Generator
+        self.rng = rng or np.random.default_rng()
+        # Last run and its termination state, for snapshot(); state restore() staged for the next run
+        self._run = None
+        self._termination = None
+        self._restored = None
         
     def target_function(self, x, a, b, c, d):
         """Base target function"""
         return (a * np.power(x, 3) + b * np.power(x, 2) + c * x + d) / 4
     
-    def error_function(self, params, x, y, critical_points=None):
+    def error_function(self, params, x, y, critical_points=None, weights=None):
         """Enhanced error function with critical points consideration"""
         predicted = self.target_function(x, *params)
-        mse = np.mean((y - predicted)**2)
+        # Weights are point multiplicities, e.g. from decimate_points
+        mse = np.average((y - predicted)**2, weights=weights)
         
         # Base regularization
         regularization = 0.01 * np.sum(np.square(params))
@@ -60,91 +263,579 @@ class FunctionOptimizer:
                     
         return mse + regularization + 0.1 * smoothness + 0.2 * critical_error
     
-    def optimize(self, x, y, critical_points=None, update_queue=None):
-        """Main optimization loop with real-time updates"""
-        # Initialize population
-        population = []
-        for _ in range(self.population_size):
-            params = np.random.uniform(-5, 5, 4)
-            population.append(params)
+    def population_errors(self, population, x, y, critical_points=None, weights=None, sample=None):
+        """error_function for every row of a (population, 4) matrix at once
         
-        best_params = None
-        best_error = float('inf')
-        generations_without_improvement = 0
+        Predictions are a (population x points) matrix product, computed in
+        row blocks to bound memory on large point sets; the critical point
+        penalties are one more product against their own design matrix.
         
-        for generation in range(self.max_attempts):
+        sample, an array of indices below len(x) - 1, estimates the MSE
+        from those points only and the smoothness term from the pairs
+        (i, i + 1), so the cost follows len(sample) instead of len(x).
+        """
+        return self._design_errors(population, cubic_design(x), y, critical_points, weights, sample)
+    
+    def _design_errors(self, population, A, y, critical_points=None, weights=None, sample=None):
+        """population_errors from the design matrix of every point, which callers may cache"""
+        population = np.asarray(population, dtype=float)
+        errors = 0.01 * np.sum(np.square(population), axis=1)
+        
+        following = None
+        if sample is not None:
+            A, following = A[sample], A[sample + 1]
+            y = np.asarray(y)[sample]
+            weights = None if weights is None else np.asarray(weights)[sample]
+        
+        block = max(_BLOCK_ENTRIES // max(len(A), 1), 1)
+        for start in range(0, len(population), block):
+            rows = population[start:start + block]
+            predicted = rows @ A.T
+            errors[start:start + block] += np.average((y - predicted)**2, axis=1, weights=weights)
+            if following is not None:
+                errors[start:start + block] += 0.1 * np.mean((rows @ following.T - predicted)**2, axis=1)
+            elif predicted.shape[1] > 1:
+                errors[start:start + block] += 0.1 * np.mean(np.diff(predicted, axis=1)**2, axis=1)
+        
+        penalized = [(px, 0.0 if kind == 'x_intercept' else py)
+                     for kind, px, py in critical_points or [] if kind in _PENALIZED_POINTS]
+        if penalized:
+            px, targets = np.array(penalized, dtype=float).T
+            errors += 0.2 * np.sum(np.abs(population @ cubic_design(px).T - targets), axis=1)
+        return errors
+    
+    def optimize(self, x, y, critical_points=None, update_queue=None, weights=None, checkpoint=None):
+        """Main optimization loop with real-time updates
+        
+        Runs up to max_attempts batches of batch_size generations, ending
+        as soon as a stopping rule fires; the reason is kept in
+        stop_reason and set on the last OptimizationResult sent.
+        
+        With a checkpoint path, a run saved there earlier is resumed, and
+        the state is written back every checkpoint_interval seconds and
+        when the run ends, so an interrupted batch fit loses at most one
+        interval of work.
+        """
+        reporter = _ProgressReporter(None if self.silent else update_queue,
+                                     self.report_interval, self.report_improvement)
+        if self.islands > 1:
+            if checkpoint is not None or self._restored is not None:
+                raise ValueError("Checkpoints need a single population (islands=1)")
+            return self._optimize_islands(x, y, critical_points, weights, reporter)
+        
+        run = _ENGINES[self.engine](self, x, y, critical_points, weights)
+        termination = _Termination(self)
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.restore(checkpoint)
+        if self._restored is not None:
+            self._load(self._restored, run, termination)
+            self._restored = None
+        self._run, self._termination = run, termination
+        
+        saved = time.perf_counter()
+        stop_reason = None
+        while run.generation < self.max_attempts * self.batch_size and not stop_reason:
             # Process batch of generations
             for _ in range(self.batch_size):
-                population_array = np.array(population)
-                errors = np.array([
-                    self.error_function(p, x, y, critical_points) 
-                    for p in population_array
-                ])
-                
-                # Update best solution
-                min_error_idx = np.argmin(errors)
-                if errors[min_error_idx] < best_error:
-                    best_error = errors[min_error_idx]
-                    best_params = population_array[min_error_idx].copy()
-                    generations_without_improvement = 0
-                else:
-                    generations_without_improvement += 1
-                
-                # Evolution step
-                population = self._evolve_population(
-                    population_array, errors, generations_without_improvement
-                )
-                
-                # Adaptive learning
-                if generations_without_improvement > 20:
-                    self.learning_rate *= 0.95
-                    generations_without_improvement = 0
-                
-                # Early stopping
-                if best_error < 1e-6:
+                run.step()
+                stop_reason = termination.check(run)
+                if stop_reason:
                     break
             
             # Update progress
-            if update_queue:
-                result = OptimizationResult(
-                    params=best_params.copy(),
-                    error=best_error,
-                    function_type="cubic",
-                    generation=generation * self.batch_size
-                )
-                update_queue.put(result)
-            
-            # Brief pause
-            time.sleep(0.001)
+            reporter.update(run.best_params, run.best_error, run.generation, run.evaluations)
+            if checkpoint is not None and time.perf_counter() - saved >= self.checkpoint_interval:
+                self.snapshot(checkpoint)
+                saved = time.perf_counter()
+        
+        if checkpoint is not None:
+            self.snapshot(checkpoint)
+        self.stop_reason = stop_reason
+        reporter.finish(run.best_params, run.best_error, run.generation, run.evaluations, stop_reason)
+        return run.best_params, run.best_error
+    
+    def snapshot(self, path):
+        """Write the state of the current or last run to a compressed .npz file
+        
+        Population, best, counters, learning rate, engine and mini-batch
+        state and the Generator's position are all saved, so a restored run
+        continues exactly as the original would have.
+        """
+        if self._run is None:
+            raise ValueError("No optimizer run to snapshot")
+        state = {**self._run.state(), **self._termination.state(),
+                 'version': np.asarray(_CHECKPOINT_VERSION),
+                 'engine': np.asarray(self.engine),
+                 'population_size': np.asarray(self.population_size),
+                 'rng': np.asarray(json.dumps(self._run.rng.bit_generator.state))}
+        # Write then rename, so a crash mid-write never leaves a truncated checkpoint
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as f:
+            np.savez_compressed(f, **state)
+        os.replace(temporary, path)
+    
+    def restore(self, path):
+        """Load a snapshot; the next optimize() resumes that run instead of starting anew"""
+        with np.load(path) as data:
+            state = {name: data[name] for name in data.files}
+        if int(state['version']) != _CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {int(state['version'])}")
+        if str(state['engine']) != self.engine or int(state['population_size']) != self.population_size:
+            raise ValueError(f"Checkpoint is for engine {state['engine']} with population "
+                             f"{int(state['population_size'])}, not {self.engine} with {self.population_size}")
+        self._restored = state
+    
+    def _load(self, state, run, termination):
+        run.load_state(state)
+        termination.load_state(state)
+        rng_state = json.loads(str(state['rng']))
+        if rng_state['bit_generator'] != type(run.rng.bit_generator).__name__:
+            raise ValueError(f"Checkpoint needs a {rng_state['bit_generator']} Generator")
+        run.rng.bit_generator.state = rng_state
+    
+    def _optimize_islands(self, x, y, critical_points, weights, reporter):
+        """Run one population per worker process, with elites migrating through shared memory
+        
+        Each island writes its emigrants to its own slot of a shared
+        (islands, migrants, 5) array and takes in its ring neighbour's.
+        Islands send their best to this process whenever it improves; the
+        overall best goes to the reporter like a single run's would. An
+        island reaching target_error stops them all; otherwise the run's
+        stop reason is that of the last island to finish.
+        """
+        context = multiprocessing.get_context()
+        memory = shared_memory.SharedMemory(create=True, size=self.islands * self.migrants * 5 * 8)
+        slots = np.ndarray((self.islands, self.migrants, 5), dtype=float, buffer=memory.buf)
+        slots[:] = np.nan
+        lock, messages, stop = context.Lock(), context.Queue(), context.Event()
+        
+        # Seeded from the optimizer's Generator so islands differ from each other
+        seeds = self.rng.integers(0, 2**63, self.islands)
+        settings = {name: getattr(self, name) for name in _ISLAND_SETTINGS}
+        settings['learning_rate'] = self.learning_rate
+        workers = [
+            context.Process(target=_island_worker, daemon=True,
+                            args=(settings, i, int(seeds[i]), x, y, critical_points, weights,
+                                  memory.name, lock, messages, stop))
+            for i in range(self.islands)
+        ]
         
+        best_params, best_error, generation, evaluations = None, float('inf'), 0, {}
+        stop_reasons = []
+        try:
+            for worker in workers:
+                worker.start()
+            running = len(workers)
+            while running:
+                try:
+                    message = messages.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        break
+                    continue
+                index, done, params, error, island_generation, island_evaluations, reason = message
+                if done:
+                    running -= 1
+                    stop_reasons.append(reason)
+                generation = max(generation, island_generation)
+                evaluations[index] = island_evaluations
+                if params is not None and error < best_error:
+                    best_params, best_error = params, error
+                reporter.update(best_params, best_error, generation, sum(evaluations.values()))
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            del slots
+            memory.close()
+            memory.unlink()
+        
+        if 'target error' in stop_reasons:
+            self.stop_reason = 'target error'
+        else:
+            self.stop_reason = stop_reasons[-1] if stop_reasons else 'failed'
+        reporter.finish(best_params, best_error, generation, sum(evaluations.values()), self.stop_reason)
         return best_params, best_error
     
-    def _evolve_population(self, population, errors, stagnation):
+    def _evolve_population(self, population, errors, stagnation, learning_rate=None, rng=None):
         """Evolve population using tournament selection and adaptive mutation"""
-        new_population = []
-        
+        rng = rng or self.rng
         # Elitism
         elite_indices = np.argsort(errors)[:self.elite_size]
         elites = population[elite_indices]
-        new_population.extend(elites)
-        
-        # Generate rest of population
-        while len(new_population) < self.population_size:
-            # Tournament selection
-            tournament_size = 3
-            tournament_idx = np.random.choice(len(population), tournament_size)
-            tournament_errors = errors[tournament_idx]
-            parent_idx = tournament_idx[np.argmin(tournament_errors)]
-            parent = population[parent_idx]
+        
+        # Tournament selection for every child at once: one row of contestants each
+        children = max(self.population_size - len(elites), 0)
+        tournament_size = 3
+        tournament_idx = rng.integers(0, len(population), (children, tournament_size))
+        winners = np.argmin(errors[tournament_idx], axis=1)
+        parents = population[tournament_idx[np.arange(children), winners]]
+        
+        # Adaptive mutation, increasing in strength during stagnation
+        if learning_rate is None:
+            learning_rate = self.learning_rate
+        mutation_strength = learning_rate * (1 + stagnation / 50)
+        mutate = rng.random(children) < self.mutation_rate
+        mutation = rng.normal(0, mutation_strength, parents.shape)
+        children = parents + mutation * mutate[:, None]
+        
+        return np.vstack([elites, children])
+
+
+class _Fitness:
+    """Scores a run's candidates, on every point or on a rotating random subsample
+    
+    In mini-batch mode each call takes the next indices of a shuffled
+    order of the points, so successive generations see different points
+    and all of them in turn. Selection uses those estimates, but a
+    candidate only becomes a run's best after improve() re-scores it on
+    the full set, so reported errors are always exact.
+    """
+    
+    STATE = ('size', 'order', 'position', 'evaluations')
+    
+    def __init__(self, optimizer, x, y, critical_points=None, weights=None, rng=None):
+        self.optimizer = optimizer
+        self.rng = rng or optimizer.rng
+        # The design matrix is built once per run; samples and re-scores index into it
+        self.data = (cubic_design(x), y, critical_points, weights)
+        # Pairs (i, i + 1) carry the smoothness term, so indices stop one short of the end
+        self.pairs = max(len(x) - 1, 0)
+        self.size = None
+        if optimizer.minibatch is not None and optimizer.minibatch < self.pairs:
+            self.size = optimizer.minibatch
+        self.order = self.rng.permutation(self.pairs) if self.size else None
+        self.position = 0
+        self.evaluations = 0
+    
+    @property
+    def exact(self):
+        return self.size is None
+    
+    def grow(self):
+        """Double the sample up to minibatch_max, or to every point once that is
+        not much more; False when it cannot grow"""
+        if self.exact or self.size >= self.optimizer.minibatch_max:
+            return False
+        self.size = min(self.size * 2, self.optimizer.minibatch_max)
+        if self.size * 2 > self.pairs:
+            self.size = None
+        return True
+    
+    def _sample(self):
+        if self.position + self.size > self.pairs:
+            self.order = self.rng.permutation(self.pairs)
+            self.position = 0
+        sample = self.order[self.position:self.position + self.size]
+        self.position += self.size
+        return sample
+    
+    def __call__(self, candidates):
+        self.evaluations += len(candidates)
+        sample = None if self.exact else self._sample()
+        return self.optimizer._design_errors(candidates, *self.data, sample=sample)
+    
+    def improve(self, candidates, errors, best_error):
+        """(params, exact error) of the generation's best if it beats best_error, else None"""
+        i = np.argmin(errors)
+        error = errors[i]
+        if not self.exact:
+            self.evaluations += 1
+            error = self.optimizer._design_errors(candidates[i:i + 1], *self.data)[0]
+        return (candidates[i].copy(), error) if error < best_error else None
+
+
+class _GARun:
+    """Everything one GA population changes as it evolves
+    
+    The learning rate starts from the optimizer's and decays here, so
+    runs sharing a FunctionOptimizer do not inherit each other's decay.
+    """
+    
+    STATE = ('population', 'best_params', 'best_error', 'stagnation', 'learning_rate', 'generation')
+    
+    def __init__(self, optimizer, x, y, critical_points=None, weights=None, rng=None):
+        self.optimizer = optimizer
+        self.rng = rng or optimizer.rng
+        self.fitness = _Fitness(optimizer, x, y, critical_points, weights, self.rng)
+        self.population = self.rng.uniform(-5, 5, (optimizer.population_size, 4))
+        self.best_params = None
+        self.best_error = float('inf')
+        self.stagnation = 0
+        self.learning_rate = optimizer.learning_rate
+        self.generation = 0
+        self.scored = None
+    
+    @property
+    def evaluations(self):
+        return self.fitness.evaluations
+    
+    def state(self):
+        return {**_get_state(self, self.STATE), **_get_state(self.fitness, _Fitness.STATE, 'fitness_')}
+    
+    def load_state(self, state):
+        _set_state(self, self.STATE, state)
+        _set_state(self.fitness, _Fitness.STATE, state, 'fitness_')
+    
+    def step(self):
+        """Score the population and breed the next generation from it"""
+        errors = self.fitness(self.population)
+        
+        # Update best solution
+        improved = self.fitness.improve(self.population, errors, self.best_error)
+        if improved:
+            self.best_params, self.best_error = improved
+            self.stagnation = 0
+        else:
+            self.stagnation += 1
+        
+        # Evolution step
+        self.scored = (self.population, errors)
+        self.population = self.optimizer._evolve_population(
+            self.population, errors, self.stagnation, self.learning_rate, self.rng
+        )
+        
+        # Adaptive learning
+        if self.stagnation > 20:
+            self.learning_rate *= 0.95
+            self.stagnation = 0
+        self.generation += 1
+    
+    def emigrants(self, count):
+        """The best individuals of the last scored generation and their errors"""
+        population, errors = self.scored
+        order = np.argsort(errors)[:count]
+        return population[order], errors[order]
+    
+    def immigrate(self, params, errors):
+        """Replace the last individuals, never the elites, with migrants"""
+        self.population[len(self.population) - len(params):] = params
+
+
+class _DERun:
+    """Differential evolution, rand/1/bin
+    
+    Each individual gets a trial vector: a random base plus
+    differential_weight times the difference of two others, crossed over
+    per coordinate with probability crossover_rate (at least one
+    coordinate always comes from the mutant). The trial replaces the
+    individual if it scores no worse. Donors are drawn as offsets from
+    each index, so they never equal the individual itself.
+    """
+    
+    STATE = ('population', 'errors', 'best_params', 'best_error', 'generation')
+    
+    def __init__(self, optimizer, x, y, critical_points=None, weights=None, rng=None):
+        self.optimizer = optimizer
+        self.rng = rng or optimizer.rng
+        self.fitness = _Fitness(optimizer, x, y, critical_points, weights, self.rng)
+        self.population = self.rng.uniform(-5, 5, (optimizer.population_size, 4))
+        self.errors = None
+        self.best_params = None
+        self.best_error = float('inf')
+        self.generation = 0
+    
+    @property
+    def evaluations(self):
+        return self.fitness.evaluations
+    
+    def state(self):
+        return {**_get_state(self, self.STATE), **_get_state(self.fitness, _Fitness.STATE, 'fitness_')}
+    
+    def load_state(self, state):
+        _set_state(self, self.STATE, state)
+        _set_state(self.fitness, _Fitness.STATE, state, 'fitness_')
+    
+    def _track(self, candidates, errors):
+        improved = self.fitness.improve(candidates, errors, self.best_error)
+        if improved:
+            self.best_params, self.best_error = improved
+    
+    def step(self):
+        """Score the initial population, or run one round of trials against it"""
+        if self.errors is None:
+            self.errors = self.fitness(self.population)
+            self._track(self.population, self.errors)
+        else:
+            size, dims = self.population.shape
+            donors = (np.arange(size)[:, None] + self.rng.integers(1, size, (size, 3))) % size
+            base, first, second = (self.population[donors[:, k]] for k in range(3))
+            mutant = base + self.optimizer.differential_weight * (first - second)
             
-            # Adaptive mutation
-            child = parent.copy()
-            if np.random.random() < self.mutation_rate:
-                # Increase mutation strength during stagnation
-                mutation_strength = self.learning_rate * (1 + stagnation / 50)
-                mutation = np.random.normal(0, mutation_strength, 4)
-                child = child + mutation
+            cross = self.rng.random((size, dims)) < self.optimizer.crossover_rate
+            cross[np.arange(size), self.rng.integers(0, dims, size)] = True
+            trial = np.where(cross, mutant, self.population)
             
-            new_population.append(child)
+            if self.fitness.exact:
+                trial_errors = self.fitness(trial)
+            else:
+                # Stored errors come from other samples; compare both sides on this one
+                errors = self.fitness(np.vstack([self.population, trial]))
+                self.errors, trial_errors = errors[:size], errors[size:]
+            self._track(trial, trial_errors)
+            better = trial_errors <= self.errors
+            self.population[better] = trial[better]
+            self.errors[better] = trial_errors[better]
+        self.generation += 1
+    
+    def emigrants(self, count):
+        order = np.argsort(self.errors)[:count]
+        return self.population[order], self.errors[order]
+    
+    def immigrate(self, params, errors):
+        """Replace the worst individuals with migrants"""
+        worst = np.argsort(self.errors)[len(self.errors) - len(params):]
+        self.population[worst] = params
+        self.errors[worst] = errors
+
+
+class _CMAESRun:
+    """Covariance matrix adaptation evolution strategy
+    
+    Samples population_size candidates from N(mean, sigma^2 C), moves the
+    mean to the weighted average of the best half and adapts C and sigma
+    from the evolution paths, with the standard default learning rates.
+    Migrants are injected as candidates of the next generation.
+    """
+    
+    STATE = ('mean', 'sigma', 'C', 'B', 'D', 'ps', 'pc', 'best_params', 'best_error', 'generation')
+    
+    def __init__(self, optimizer, x, y, critical_points=None, weights=None, rng=None):
+        self.optimizer = optimizer
+        self.rng = rng or optimizer.rng
+        self.fitness = _Fitness(optimizer, x, y, critical_points, weights, self.rng)
+        n = 4
+        self.size = max(optimizer.population_size, 4)
+        self.mu = self.size // 2
+        w = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = w / w.sum()
+        self.mueff = 1 / np.sum(self.weights**2)
+        
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3)**2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2)**2 + self.mueff))
+        self.damps = 1 + 2 * max(0, np.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n**2))
+        
+        self.mean = self.rng.uniform(-5, 5, n)
+        self.sigma = optimizer.initial_sigma
+        self.C = np.eye(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.ps = np.zeros(n)
+        self.pc = np.zeros(n)
+        self.injected = None
+        self.scored = None
+        self.best_params = None
+        self.best_error = float('inf')
+        self.generation = 0
+    
+    @property
+    def evaluations(self):
+        return self.fitness.evaluations
+    
+    def state(self):
+        return {**_get_state(self, self.STATE), **_get_state(self.fitness, _Fitness.STATE, 'fitness_')}
+    
+    def load_state(self, state):
+        _set_state(self, self.STATE, state)
+        _set_state(self.fitness, _Fitness.STATE, state, 'fitness_')
+    
+    def step(self):
+        """Sample, score and update the distribution once"""
+        n = len(self.mean)
+        steps = self.rng.standard_normal((self.size, n)) @ (self.B * self.D).T
+        candidates = self.mean + self.sigma * steps
+        if self.injected is not None:
+            candidates[len(candidates) - len(self.injected):] = self.injected
+            steps = (candidates - self.mean) / self.sigma
+            self.injected = None
         
-        return new_population
\ No newline at end of file
+        errors = self.fitness(candidates)
+        self.scored = (candidates, errors)
+        improved = self.fitness.improve(candidates, errors, self.best_error)
+        if improved:
+            self.best_params, self.best_error = improved
+        
+        # Recombination of the best mu steps
+        selected = steps[np.argsort(errors)[:self.mu]]
+        step = self.weights @ selected
+        self.mean = self.mean + self.sigma * step
+        
+        # Evolution paths; the sigma path uses the C^-1/2 whitened step
+        whitened = self.B @ ((self.B.T @ step) / self.D)
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * whitened
+        norm = np.linalg.norm(self.ps) / np.sqrt(1 - (1 - self.cs)**(2 * (self.generation + 1)))
+        hsig = norm / self.chi_n < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * step
+        
+        # Rank-one and rank-mu covariance updates, then the step size
+        rank_one = np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C
+        rank_mu = (selected.T * self.weights) @ selected
+        self.C = (1 - self.c1 - self.cmu) * self.C + self.c1 * rank_one + self.cmu * rank_mu
+        self.sigma *= np.exp((self.cs / self.damps) * (np.linalg.norm(self.ps) / self.chi_n - 1))
+        
+        self.C = (self.C + self.C.T) / 2
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+        self.generation += 1
+    
+    def emigrants(self, count):
+        candidates, errors = self.scored
+        order = np.argsort(errors)[:count]
+        return candidates[order], errors[order]
+    
+    def immigrate(self, params, errors):
+        self.injected = np.array(params[:self.size])
+
+
+_ENGINES = {'ga': _GARun, 'cmaes': _CMAESRun, 'de': _DERun}
+
+
+def _island_worker(settings, index, seed, x, y, critical_points, weights,
+                   memory_name, lock, messages, stop):
+    """One island: evolve, exchange migrants every migration_interval generations, report"""
+    rng = np.random.default_rng(seed)
+    settings = dict(settings)
+    learning_rate = settings.pop('learning_rate')
+    optimizer = FunctionOptimizer(silent=True, rng=rng, **settings)
+    optimizer.learning_rate = learning_rate
+    memory = shared_memory.SharedMemory(name=memory_name)
+    slots = np.ndarray((optimizer.islands, optimizer.migrants, 5), dtype=float, buffer=memory.buf)
+    try:
+        run = _ENGINES[optimizer.engine](optimizer, x, y, critical_points, weights, rng)
+        termination = _Termination(optimizer)
+        total = optimizer.max_attempts * optimizer.batch_size
+        reported = float('inf')
+        stop_reason = None
+        while run.generation < total and stop_reason is None:
+            for _ in range(min(optimizer.migration_interval, total - run.generation)):
+                run.step()
+                stop_reason = termination.check(run)
+                if stop_reason:
+                    break
+            if stop_reason == 'target error':
+                stop.set()
+            elif stop.is_set():
+                stop_reason = 'stopped'
+            
+            # Publish our emigrants and take in the previous island's
+            params, errors = run.emigrants(optimizer.migrants)
+            with lock:
+                slots[index, :len(params), :4] = params
+                slots[index, :len(params), 4] = errors
+                incoming = slots[(index - 1) % optimizer.islands].copy()
+            incoming = incoming[np.isfinite(incoming[:, 4])]
+            if len(incoming):
+                run.immigrate(incoming[:, :4], incoming[:, 4])
+            
+            if run.best_error < reported:
+                messages.put((index, False, run.best_params, run.best_error, run.generation,
+                              run.evaluations, None))
+                reported = run.best_error
+        messages.put((index, True, run.best_params, run.best_error, run.generation, run.evaluations,
+                      stop_reason))
+    finally:
+        del slots
+        memory.close()
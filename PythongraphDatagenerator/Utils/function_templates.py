@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import sympy as sp
+
+# Family constants; real so that derivatives of Abs() stay free of re/im terms
+PARAM_SYMBOLS = sp.symbols('a b c d', real=True)
+
+# name: (function type, expression builder, parameter count, label format, max_abs)
+_FAMILIES = {
+    'logarithmic': ('logarithmic', lambda x, a, b, c, d: a * sp.log(sp.Abs(b * x + c)) + d, 4,
+                    '{0:.2f} * ln(|{1:.2f}x + {2:.2f}|) + {3:.2f}', None),
+    'exponential': ('exponential', lambda x, a, b, c, d: a * sp.exp(b * x) + c, 3,
+                    '{0:.2f} * e^({1:.2f}x) + {2:.2f}', None),
+    'rational': ('rational', lambda x, a, b, c, d: (a * x + b) / (c * x + d), 4,
+                 '({0:.2f}x + {1:.2f})/({2:.2f}x + {3:.2f})', None),
+    'sin': ('trigonometric', lambda x, a, b, c, d: a * sp.sin(b * x) + c, 3,
+            '{0:.2f} * sin({1:.2f}x) + {2:.2f}', 1e10),
+    'cos': ('trigonometric', lambda x, a, b, c, d: a * sp.cos(b * x) + c, 3,
+            '{0:.2f} * cos({1:.2f}x) + {2:.2f}', 1e10),
+    'tan': ('trigonometric', lambda x, a, b, c, d: a * sp.tan(b * x) + c, 3,
+            '{0:.2f} * tan({1:.2f}x) + {2:.2f}', 1e10),
+    'linear': ('linear', lambda x, a, b, c, d: a * x + b, 2,
+               '{0:.2f}x + {1:.2f}', None),
+}
+
+# Templates available for each generator function type
+TYPE_TEMPLATES = {
+    'logarithmic': ['logarithmic'],
+    'exponential': ['exponential'],
+    'rational': ['rational'],
+    'trigonometric': ['sin', 'cos', 'tan'],
+    'linear': ['linear'],
+}
+
+# Sampling range of each constant: the scale a is kept away from zero
+PARAM_RANGES = [(0.5, 2), (-2, 2), (-2, 2), (-2, 2)]
+
+
+class FunctionTemplate:
+    """A function family compiled once, with its constants passed as arguments
+
+    evaluate() broadcasts a (functions x params) matrix against a vector of
+    x values, so a whole batch of instances costs one vectorized call. The
+    NaN masking rules match CompiledFunction.
+    """
+
+    def __init__(self, name, function_type, expr, symbol, params, label_format,
+                 max_abs=None, pole_tolerance=1e-10):
+        self.name = name
+        self.function_type = function_type
+        self.expr = expr
+        self.symbol = symbol
+        self.params = params
+        self.label_format = label_format
+        self.max_abs = max_abs
+        self.pole_tolerance = pole_tolerance
+        self._derivatives = {}
+
+        arguments = (symbol,) + tuple(params)
+        self._func = sp.lambdify(arguments, expr, modules='numpy')
+
+        _, denominator = sp.fraction(sp.together(expr))
+        self._denominator = None
+        if denominator.has(symbol):
+            self._denominator = sp.lambdify(arguments, denominator, modules='numpy')
+
+    def evaluate(self, params, x):
+        """Values for every parameter row at every x: (n, k) and (m,) give (n, m)
+
+        A single parameter vector gives an array shaped like x.
+        """
+        params = np.asarray(params, dtype=float)
+        x_arr = np.asarray(x, dtype=float)
+        single = params.ndim == 1
+        params = np.atleast_2d(params)
+
+        # Parameter columns broadcast over the trailing axes of x
+        columns = [params[:, i].reshape((-1,) + (1,) * x_arr.ndim) for i in range(params.shape[1])]
+        shape = (params.shape[0],) + x_arr.shape
+
+        with np.errstate(all='ignore'):
+            y = np.asarray(self._func(x_arr, *columns))
+            if np.iscomplexobj(y):
+                y = np.where(np.imag(y) == 0, np.real(y), np.nan)
+            y = np.broadcast_to(y, shape).astype(float)
+
+            invalid = ~np.isfinite(y)
+            if self.max_abs is not None:
+                invalid |= np.abs(y) > self.max_abs
+            if self._denominator is not None:
+                denominator = np.broadcast_to(self._denominator(x_arr, *columns), shape)
+                invalid |= np.abs(denominator) < self.pole_tolerance
+
+        y = np.where(invalid, np.nan, y)
+        return y[0] if single else y
+
+    def derivative(self, order=1):
+        """Compiled template of the n-th derivative, built once per order"""
+        if order not in self._derivatives:
+            real = sp.Dummy('x', real=True)
+            derivative = sp.diff(self.expr.subs(self.symbol, real), real, order)
+            self._derivatives[order] = FunctionTemplate(
+                self.name, self.function_type, derivative.subs(real, self.symbol), self.symbol,
+                self.params, self.label_format, self.max_abs, self.pole_tolerance
+            )
+        return self._derivatives[order]
+
+    def instantiate(self, values):
+        """Concrete sympy expression for one parameter vector"""
+        # xreplace rebuilds the tree once, far cheaper than subs
+        return self.expr.xreplace({p: sp.Float(float(v)) for p, v in zip(self.params, values)})
+
+    def label(self, values):
+        return self.label_format.format(*values)
+
+    def bind(self, values):
+        return BoundTemplate(self, tuple(float(v) for v in values))
+
+
+@dataclass(frozen=True)
+class BoundTemplate:
+    """Callable for one instance of a template, usable wherever a CompiledFunction is"""
+    template: FunctionTemplate
+    values: tuple
+
+    def __call__(self, x):
+        y = self.template.evaluate(self.values, x)
+        return float(y) if np.ndim(y) == 0 else y
+
+    def derivative(self, order=1):
+        return BoundTemplate(self.template.derivative(order), self.values)
+
+    @property
+    def expr(self):
+        return self.template.instantiate(self.values)
+
+
+@lru_cache(maxsize=None)
+def get_template(name, symbol=sp.Symbol('x')):
+    """Compiled template for a family name, shared by every caller"""
+    function_type, build, count, label_format, max_abs = _FAMILIES[name]
+    params = PARAM_SYMBOLS[:count]
+    expr = build(symbol, *PARAM_SYMBOLS)
+    return FunctionTemplate(name, function_type, expr, symbol, params, label_format, max_abs)
+
+
+def sample_parameters(name, count, rng):
+    """(count, k) matrix of rounded constants for a template, from a NumPy Generator"""
+    k = len(get_template(name).params)
+    low, high = np.array(PARAM_RANGES[:k]).T
+    return np.round(rng.uniform(low, high, size=(count, k)), 2)
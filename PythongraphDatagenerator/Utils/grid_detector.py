@@ -34,8 +34,8 @@ class GridDetector:
         h_lines = []
         v_lines = []
         
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
+        # OpenCV 4 returns (N, 1, 4) and OpenCV 5 returns (N, 4)
+        for x1, y1, x2, y2 in lines.reshape(-1, 4):
             angle = np.abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
             
             if angle < 20:  # Horizontal
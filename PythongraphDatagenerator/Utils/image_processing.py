@@ -65,19 +65,18 @@ class ImageProcessor:
         
         # Draw the function points in red
         if len(points) > 0:
-            # Create point coordinates
-            coords = []
-            for point in points:
-                px = int(point[0] * grid_info.x_scale + grid_info.origin[0])
-                py = int(grid_info.origin[1] - point[1] * grid_info.y_scale)
-                coords.append((px, py))
+            # Create point coordinates in one array operation
+            points = np.asarray(points, dtype=float)
+            coords = np.column_stack([
+                points[:, 0] * grid_info.x_scale + grid_info.origin[0],
+                grid_info.origin[1] - points[:, 1] * grid_info.y_scale
+            ]).astype(np.int32)
             
             # Draw points
-            for px, py in coords:
+            for px, py in coords.tolist():
                 cv2.circle(result, (px, py), 2, (0, 0, 255), -1)
             
             # Draw lines between points for continuity
-            coords = np.array(coords)
             cv2.polylines(result, [coords], False, (255, 0, 0), 1)
         
         # Draw critical points
@@ -157,15 +156,24 @@ class ImageProcessor:
         
         return points
     
-    def process_image(self, image):
-        """Complete image processing pipeline"""
+    def process_image(self, image, progress=None):
+        """Complete image processing pipeline
+        
+        progress, if given, is called as progress(stage, fraction) before
+        each stage and may raise to abandon the pipeline between stages.
+        """
+        report = progress or (lambda stage, fraction: None)
+        
         # Detect grid
+        report("Detecting grid", 0.0)
         grid_info = self.grid_detector.detect_grid(image)
         
         # Extract graph points
+        report("Extracting graph points", 1 / 3)
         graph_points = self.extract_graph_points(image, grid_info)
         
         # Find critical points
+        report("Finding critical points", 2 / 3)
         if len(graph_points) > 0:
             critical_points = self.grid_detector.find_critical_points(graph_points, grid_info)
             if grid_info:
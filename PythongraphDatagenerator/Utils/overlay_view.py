@@ -0,0 +1,69 @@
+import cv2
+
+
+class OverlayView:
+    """An image on a Matplotlib axes plus one curve redrawn by blitting
+
+    The image artist is created once and later images only replace its
+    data, downscaled to the axes' pixel size so large (e.g. 4K) inputs are
+    not resampled by Matplotlib on every draw. The curve is an animated
+    artist: set_curve() restores the cached background, draws the curve
+    and blits, without re-rendering the image. Coordinates stay in the
+    original image's pixels whatever the display scale.
+    """
+
+    def __init__(self, ax, canvas, curve_color='magenta'):
+        self.ax = ax
+        self.canvas = canvas
+        self.image_artist = None
+        self.image_shape = None
+        self.background = None
+        self.curve, = ax.plot([], [], color=curve_color, linewidth=1.5, animated=True)
+        ax.axis('off')
+        # Resizes and full redraws invalidate the background; recapture it after each
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _display_size(self):
+        """Axes size in screen pixels"""
+        bbox = self.ax.get_window_extent()
+        return max(int(bbox.width), 1), max(int(bbox.height), 1)
+
+    def set_image(self, image):
+        """Show an RGB image, replacing the previous one"""
+        height, width = image.shape[:2]
+        max_width, max_height = self._display_size()
+        scale = min(max_width / width, max_height / height, 1.0)
+        if scale < 1.0:
+            size = (max(int(width * scale), 1), max(int(height * scale), 1))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+        # The extent keeps data coordinates in original pixels after downscaling
+        extent = (-0.5, width - 0.5, height - 0.5, -0.5)
+        if self.image_artist is None:
+            self.image_artist = self.ax.imshow(image, extent=extent)
+        else:
+            self.image_artist.set_data(image)
+            self.image_artist.set_extent(extent)
+        self.image_shape = (height, width)
+        self.ax.set_xlim(extent[0], extent[1])
+        self.ax.set_ylim(extent[2], extent[3])
+        # The cached background still shows the old image; curves draw in full until the next draw
+        self.background = None
+        self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.curve)
+
+    def set_curve(self, x, y):
+        """Replace the curve (image pixel coordinates) and blit it over the cached background"""
+        self.curve.set_data(x, y)
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.curve)
+        self.canvas.blit(self.ax.bbox)
+
+    def clear_curve(self):
+        self.set_curve([], [])
@@ -3,6 +3,8 @@ import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from .curve_fitting import evaluate_function
+
 class PlotManager:
     def __init__(self, figure_size=(6, 8), dpi=80):
         # Create figure and subplots
@@ -32,13 +34,14 @@ class PlotManager:
         
         self.fig.tight_layout()
     
-    def update_plots(self, original_points, params, error_history, grid_info=None):
+    def update_plots(self, original_points, params, error_history, grid_info=None,
+                     function_type='cubic'):
         """Update both plots with new data"""
-        self._update_comparison_plot(original_points, params, grid_info)
+        self._update_comparison_plot(original_points, params, grid_info, function_type)
         self._update_error_plot(error_history)
         self.fig.canvas.draw()
     
-    def _update_comparison_plot(self, original_points, params, grid_info):
+    def _update_comparison_plot(self, original_points, params, grid_info, function_type='cubic'):
         """Update function comparison plot"""
         self.comparison_ax.clear()
         
@@ -54,13 +57,11 @@ class PlotManager:
             max(original_points[:, 0]),
             200
         )
-        y_smooth = (params[0] * np.power(x_smooth, 3) + 
-                   params[1] * np.power(x_smooth, 2) + 
-                   params[2] * x_smooth + params[3]) / 4
+        y_smooth = evaluate_function(function_type, x_smooth, params)
         
         self.comparison_ax.plot(
             x_smooth, y_smooth, 'r-',
-            label='Generated', linewidth=1, rasterized=True
+            label=f'Generated ({function_type})', linewidth=1, rasterized=True
         )
         
         # Add grid if available
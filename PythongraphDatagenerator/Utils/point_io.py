@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+
+import numpy as np
+
+# Local file header layout of a zip member (see the PKZIP APPNOTE)
+_ZIP_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+
+def save_points_npz(path, x, y, metadata, dtype=np.float64):
+    """Write x/y as contiguous arrays in an uncompressed .npz with a JSON header"""
+    np.savez(
+        path,
+        x=np.ascontiguousarray(x, dtype=dtype),
+        y=np.ascontiguousarray(y, dtype=dtype),
+        metadata=np.array(json.dumps(metadata))
+    )
+
+
+def _write_npy_member(zip_file, name, source, count, dtype):
+    """Copy raw array bytes from a file into a .npy member, block by block"""
+    header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+              'shape': (count,)}
+    with zip_file.open(name, 'w', force_zip64=True) as out:
+        np.lib.format.write_array_header_1_0(out, header)
+        shutil.copyfileobj(source, out, 1 << 20)
+
+
+def save_points_npz_stream(path, point_chunks, metadata, dtype=np.float64):
+    """Write (x, y) chunks to the .npz format with bounded memory, returning the point count
+
+    metadata may be a callable, evaluated once all chunks have been consumed.
+    """
+    dtype = np.dtype(dtype)
+    count = 0
+
+    # Spool each axis to disk first since the member headers need the final length
+    with tempfile.TemporaryFile() as x_file, tempfile.TemporaryFile() as y_file:
+        for x, y in point_chunks:
+            np.ascontiguousarray(x, dtype=dtype).tofile(x_file)
+            np.ascontiguousarray(y, dtype=dtype).tofile(y_file)
+            count += len(x)
+
+        if callable(metadata):
+            metadata = metadata()
+
+        x_file.seek(0)
+        y_file.seek(0)
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True) as zip_file:
+            _write_npy_member(zip_file, 'x.npy', x_file, count, dtype)
+            _write_npy_member(zip_file, 'y.npy', y_file, count, dtype)
+            with zip_file.open('metadata.npy', 'w') as out:
+                np.lib.format.write_array(out, np.array(json.dumps(metadata)))
+
+    return count
+
+
+def _format_points(x, y):
+    """Points of one chunk laid out exactly as json.dump(..., indent=2) nests them"""
+    return ",\n".join(
+        f'    {{\n      "x": {xi!r},\n      "y": {yi!r}\n    }}'
+        for xi, yi in zip(x.tolist(), y.tolist())
+    )
+
+
+def write_points_json(path, record, point_chunks):
+    """Stream a JSON export whose 'points' entry comes from (x, y) chunks
+
+    The output is byte-identical to json.dump(record, f, indent=2) with the
+    points materialized, but only one chunk is held in memory at a time.
+    Callable values are evaluated when their key is reached, so entries
+    after 'points' can depend on the streamed data. Returns the number of
+    points written.
+    """
+    count = 0
+    with open(path, 'w') as f:
+        f.write("{")
+        for i, (key, value) in enumerate(record.items()):
+            f.write(("," if i else "") + "\n  " + json.dumps(key) + ": ")
+            if key != 'points':
+                if callable(value):
+                    value = value()
+                f.write(json.dumps(value, indent=2).replace("\n", "\n  "))
+                continue
+
+            f.write("[")
+            for x, y in point_chunks:
+                if not len(x):
+                    continue
+                f.write(("," if count else "") + "\n" + _format_points(x, y))
+                count += len(x)
+            f.write("\n  ]" if count else "]")
+        f.write("\n}")
+
+    return count
+
+
+def _member_offset(handle, info):
+    """Byte offset of a stored member's data within the archive"""
+    handle.seek(info.header_offset)
+    fields = _ZIP_LOCAL_HEADER.unpack(handle.read(_ZIP_LOCAL_HEADER.size))
+    name_length, extra_length = fields[-2], fields[-1]
+    return info.header_offset + _ZIP_LOCAL_HEADER.size + name_length + extra_length
+
+
+def _memmap_member(path, zip_file, handle, name):
+    """Memory-map one .npy member of an uncompressed .npz without copying"""
+    info = zip_file.getinfo(name)
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    handle.seek(_member_offset(handle, info))
+    version = np.lib.format.read_magic(handle)
+    if version == (1, 0):
+        header = np.lib.format.read_array_header_1_0(handle)
+    else:
+        header = np.lib.format.read_array_header_2_0(handle)
+    shape, fortran_order, dtype = header
+    if dtype.hasobject:
+        return None
+
+    return np.memmap(path, dtype=dtype, mode='r', offset=handle.tell(),
+                     shape=shape, order='F' if fortran_order else 'C')
+
+
+def load_points_npz(path, mmap=True):
+    """Load (x, y, metadata) from .npz, memory-mapping the arrays when possible"""
+    with np.load(path) as archive:
+        metadata = json.loads(str(archive['metadata']))
+        if not mmap:
+            return archive['x'], archive['y'], metadata
+
+    with zipfile.ZipFile(path) as zip_file, open(path, 'rb') as handle:
+        x = _memmap_member(path, zip_file, handle, 'x.npy')
+        y = _memmap_member(path, zip_file, handle, 'y.npy')
+
+    if x is None or y is None:
+        # Compressed archives cannot be mapped, fall back to a regular load
+        return load_points_npz(path, mmap=False)
+
+    return x, y, metadata
+
+
+def load_points_json(path):
+    """Load (x, y, metadata) from a JSON point export"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    points = data.pop('points')
+    x = np.fromiter((p['x'] for p in points), dtype=float, count=len(points))
+    y = np.fromiter((p['y'] for p in points), dtype=float, count=len(points))
+    return x, y, data
+
+
+def load_points(path, mmap=True):
+    """Load a point export in either format, chosen by file extension"""
+    if os.path.splitext(path)[1].lower() == '.npz':
+        return load_points_npz(path, mmap=mmap)
+    return load_points_json(path)
+
+
+def convert_json_to_npz(json_path, npz_path=None, dtype=np.float64):
+    """Convert an existing JSON point export to the binary format"""
+    if npz_path is None:
+        npz_path = os.path.splitext(json_path)[0] + '.npz'
+
+    x, y, metadata = load_points_json(json_path)
+    save_points_npz(npz_path, x, y, metadata, dtype=dtype)
+    return npz_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert JSON point exports to .npz")
+    parser.add_argument('files', nargs='+', help="JSON files to convert")
+    parser.add_argument('--float32', action='store_true', help="Store single precision")
+    args = parser.parse_args()
+
+    dtype = np.float32 if args.float32 else np.float64
+    for json_path in args.files:
+        npz_path = convert_json_to_npz(json_path, dtype=dtype)
+        print(f"{json_path} ({os.path.getsize(json_path)} bytes) -> "
+              f"{npz_path} ({os.path.getsize(npz_path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
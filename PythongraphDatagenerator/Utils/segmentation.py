@@ -0,0 +1,135 @@
+import numpy as np
+
+# Least growth between consecutive steps towards a turning point that marks a pole
+POLE_GROWTH = 1.5
+
+
+def jump_steps(y):
+    """Boolean mask over the n-1 steps of y marking jumps across a pole
+
+    A step is a jump when y changes sign across it, it runs against the
+    direction of both neighbouring steps, and it is larger than either of
+    them. That is the signature of tan and rational poles, where each
+    branch is monotonic but the curve wraps from +big to -big (or back).
+
+    Poles without a sign change, like ln|bx + c|, show up instead as a
+    step between two monotonic branches heading in opposite directions,
+    whose own steps grow towards it by at least POLE_GROWTH on each side;
+    around a smooth extremum they shrink instead.
+
+    Steps near the ends and steps touching NaN never qualify.
+    """
+    jumps = np.zeros(max(len(y) - 1, 0), dtype=bool)
+    if len(y) < 4:
+        return jumps
+
+    dy = np.diff(y)
+    left, step, right = dy[:-2], dy[1:-1], dy[2:]
+
+    with np.errstate(invalid='ignore'):
+        flips = np.signbit(y[1:-2]) != np.signbit(y[2:-1])
+        against = (left * right > 0) & (step * left < 0)
+        larger = (np.abs(step) > np.abs(left)) & (np.abs(step) > np.abs(right))
+
+    jumps[1:-1] = flips & against & larger & np.isfinite(step)
+
+    if len(y) >= 9:
+        # Only steps between branches heading in opposite directions can cross such a pole
+        with np.errstate(invalid='ignore'):
+            c = np.flatnonzero(dy[1:-3] * dy[3:-1] < 0) + 2
+        size = np.abs(dy)
+        with np.errstate(invalid='ignore'):
+            c = c[(dy[c - 2] * dy[c - 1] > 0) & (dy[c + 1] * dy[c + 2] > 0)
+                  & (size[c - 1] > POLE_GROWTH * size[c - 2])
+                  & (size[c + 1] > POLE_GROWTH * size[c + 2])
+                  & np.isfinite(dy[c])]
+        pole = np.zeros_like(jumps)
+        pole[c] = True
+
+        # A sample right at the pole qualifies on both sides; the pole is across the smaller step
+        c = c[(c >= 3) & (c < len(dy) - 3)]
+        beaten = ((pole[c - 1] & (size[c - 1] <= size[c]))
+                  | (pole[c + 1] & (size[c + 1] < size[c])))
+        jumps[c[~beaten]] = True
+    return jumps
+
+
+def segment_starts(y):
+    """Indices where a continuous run of finite samples begins"""
+    finite = np.isfinite(y)
+    starts = finite.copy()
+    # A finite sample continues the previous run unless it follows NaN or a jump
+    starts[1:] &= ~finite[:-1] | jump_steps(y)
+    return np.flatnonzero(starts)
+
+
+def segment_bounds(y):
+    """(start, stop) pairs of the continuous finite runs of y"""
+    finite = np.isfinite(y)
+    starts = segment_starts(y)
+    # A run ends at the next start or the first NaN after it, whichever comes first
+    stops = np.flatnonzero(finite & np.append(~finite[1:], True)) + 1
+    ends = np.append(starts[1:], len(y))
+    stops = np.minimum(ends, stops[np.searchsorted(stops, starts, side='right')])
+    return np.column_stack([starts, stops])
+
+
+def split_segments(x, y):
+    """List of (x, y) views, one per continuous segment"""
+    return [(x[start:stop], y[start:stop]) for start, stop in segment_bounds(y)]
+
+
+def insert_breaks(x, y):
+    """Copies of x and y with NaN inserted at every jump, ready for plotting"""
+    breaks = np.flatnonzero(jump_steps(y)) + 1
+    return np.insert(x, breaks, np.nan), np.insert(y, breaks, np.nan)
+
+
+class SegmentTracker:
+    """Segments of a curve streamed as raw (x, y) chunks that may contain NaN
+
+    track() passes the chunks through with NaN samples removed, and records
+    where each continuous segment starts, counted in the emitted points.
+    Jump detection looks up to three steps to either side, so the last
+    seven raw samples are carried over to the next chunk.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.count = 0
+        self._carry_y = np.empty(0)
+        self._carry_index = np.empty(0, dtype=int)
+
+    def track(self, chunks):
+        for x, y in chunks:
+            finite = np.isfinite(y)
+            index = np.full(len(y), -1)
+            index[finite] = self.count + np.arange(np.count_nonzero(finite))
+
+            buffer_y = np.concatenate([self._carry_y, y])
+            buffer_index = np.concatenate([self._carry_index, index])
+            buffer_finite = np.isfinite(buffer_y)
+            carried = len(self._carry_y)
+
+            # Runs starting after NaN (or at the very first sample)
+            new = np.arange(carried, len(buffer_y))
+            after_gap = buffer_finite[new] & ((new == 0) | ~buffer_finite[new - 1])
+            cuts = list(buffer_index[new[after_gap]])
+
+            # jump_steps only judges steps with their whole neighbourhood in the
+            # buffer, so steps near the end are judged once the next chunk arrives;
+            # a step judged in both buffers gets the same answer and is merged
+            cuts.extend(buffer_index[np.flatnonzero(jump_steps(buffer_y)) + 1])
+
+            self.starts = sorted(set(self.starts).union(int(c) for c in cuts))
+            self.count += int(np.count_nonzero(finite))
+            self._carry_y = buffer_y[-7:]
+            self._carry_index = buffer_index[-7:]
+
+            yield x[finite], y[finite]
+
+    @property
+    def segments(self):
+        """[start, stop) index pairs into the emitted points"""
+        stops = self.starts[1:] + [self.count]
+        return [[start, stop] for start, stop in zip(self.starts, stops)]
@@ -0,0 +1,545 @@
+import argparse
+import glob
+import os
+import random
+import tempfile
+import time
+import warnings
+
+import cv2
+import numpy as np
+import sympy as sp
+from scipy.optimize import curve_fit, minimize
+
+from Utils.adaptive_sampling import adaptive_sample
+from Utils.curve_fitting import CurveFitter, cubic_function
+from Utils.function_compiler import compile_function
+from Utils.function_generator import FUNCTION_TYPES, FunctionGenerator
+from Utils.cubic import cubic_design
+from Utils.function_optimizer import OPTIMIZER_ENGINES, FunctionOptimizer
+from Utils.image_processing import ImageProcessor
+from Utils.overlay_view import OverlayView
+
+
+def _time_call(func, repeat=3):
+    """Best wall-clock time of several calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _sample_expressions():
+    """One representative expression per generator function type"""
+    x = sp.Symbol('x')
+    return x, {
+        'logarithmic': 1.5 * sp.log(abs(1.2 * x - 0.7)) + 0.3,
+        'exponential': 0.8 * sp.exp(0.4 * x) - 1.1,
+        'rational': (1.3 * x + 0.5) / (0.9 * x - 1.4),
+        'trigonometric': 1.1 * sp.tan(0.6 * x) + 0.2,
+        'linear': 1.7 * x - 0.4,
+    }
+
+
+def bench_compile(args):
+    """Points/sec of per-point sympy subs versus the compiled evaluator"""
+    x, expressions = _sample_expressions()
+    grid = np.arange(-12, 12 + 0.001, 0.001)
+    subs_grid = grid[:args.subs_points]
+
+    print(f"{'type':<15}{'subs pts/s':>14}{'compiled pts/s':>18}{'speedup':>10}")
+    for name, expr in expressions.items():
+        def subs_eval():
+            out = []
+            for xi in subs_grid:
+                try:
+                    out.append(float(expr.subs(x, xi)))
+                except Exception:
+                    out.append(np.nan)
+            return out
+
+        func = compile_function(expr, x)
+        subs_rate = len(subs_grid) / _time_call(subs_eval, repeat=1)
+        compiled_rate = len(grid) / _time_call(lambda: func(grid))
+        print(f"{name:<15}{subs_rate:>14,.0f}{compiled_rate:>18,.0f}"
+              f"{compiled_rate / subs_rate:>9,.0f}x")
+
+
+def bench_sampling(args):
+    """Points and interpolation error of adaptive versus uniform sampling"""
+    x, expressions = _sample_expressions()
+    expressions['trigonometric_sin'] = 1.1 * sp.sin(1.3 * x) + 0.2
+    reference = np.linspace(-12, 12, 2_000_001)
+
+    def interpolation_error(func, xs, ys, y_true):
+        # Compare only where the function is defined, away from poles
+        mask = np.isfinite(ys)
+        y_interp = np.interp(reference, xs[mask], ys[mask])
+        valid = np.isfinite(y_true) & (np.abs(y_true) < 12)
+        return np.max(np.abs(y_interp - y_true)[valid])
+
+    print(f"{'type':<19}{'adaptive pts':>14}{'max err':>11}{'uniform pts, same err':>23}")
+    for name, expr in expressions.items():
+        func = compile_function(expr, x)
+        y_true = func(reference)
+
+        xa, ya = adaptive_sample(func, (-12, 12), args.tolerance, y_limits=(-12, 12))
+        adaptive_error = interpolation_error(func, xa, ya, y_true)
+
+        # Smallest uniform grid (to within 10%) that is at least as accurate
+        count = 65
+        while count < len(reference):
+            xu = np.linspace(-12, 12, count)
+            if interpolation_error(func, xu, func(xu), y_true) <= adaptive_error:
+                break
+            count = int(count * 1.1)
+        print(f"{name:<19}{len(xa):>14,}{adaptive_error:>11.1e}{count:>23,}")
+
+
+def bench_templates(args):
+    """Functions/sec of per-instance sympy construction versus cached templates"""
+    x = sp.Symbol('x')
+    grid = np.linspace(-12, 12, args.points)
+    generator = FunctionGenerator(rng=random.Random(0))
+
+    # The old path: build the expression from fresh constants, then compile it
+    def per_instance():
+        for _ in range(args.instances):
+            a, b, c = (round(random.uniform(-2, 2), 2) for _ in range(3))
+            compile_function(a * sp.exp(b * x) + c, x)(grid)
+
+    def single():
+        for i in range(args.instances):
+            generator.generate(FUNCTION_TYPES[i % len(FUNCTION_TYPES)]).func(grid)
+
+    def batched():
+        for func_type in FUNCTION_TYPES:
+            for batch in generator.generate_batch(func_type, args.batch // len(FUNCTION_TYPES)):
+                batch.evaluate(grid)
+
+    print(f"{'path':<28}{'functions/s':>14}")
+    print(f"{'sympy build + lambdify':<28}{args.instances / _time_call(per_instance, repeat=1):>14,.0f}")
+    print(f"{'template, one at a time':<28}{args.instances / _time_call(single):>14,.0f}")
+    print(f"{'template, batched':<28}{args.batch / _time_call(batched):>14,.0f}")
+
+
+def _decoded_images(pattern, limit):
+    """(points, critical points) of chart images, skipping ones without a grid"""
+    processor = ImageProcessor()
+    paths = sorted(glob.glob(os.path.join(pattern, '*.png') if os.path.isdir(pattern) else pattern))
+    decoded = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for path in paths[:limit]:
+            points, grid_info = processor.process_image(cv2.imread(path))
+            if grid_info is not None and len(points):
+                decoded.append((points[:, 0], points[:, 1], grid_info.critical_points))
+    return decoded
+
+
+def _loop_refinement(x, y, critical_points, p0):
+    """The original objective: one call per critical point, finite-difference gradient"""
+    def objective(p):
+        mse = np.mean((y - cubic_function(x, *p))**2)
+        critical_error = 0
+        for _, px, py in critical_points:
+            critical_error += np.abs(cubic_function(np.array([px]), *p) - py)[0]
+        return mse + 0.1 * critical_error
+
+    return minimize(objective, p0, method='L-BFGS-B').nfev
+
+
+def bench_fitting(args):
+    """Evaluations and wall time of the decoder refinements on chart images"""
+    decoded = _decoded_images(args.images, args.limit)
+    fitter = CurveFitter('vectorized')
+    print(f"{len(decoded)} images, "
+          f"{np.mean([len(cp) for *_, cp in decoded]):.0f} critical points on average")
+
+    def run(label, fit):
+        evaluations = []
+        started = time.perf_counter()
+        for x, y, critical_points in decoded:
+            evaluations.append(fit(x, y, critical_points))
+        elapsed = (time.perf_counter() - started) / max(len(decoded), 1)
+        print(f"{label:<36}{np.mean(evaluations):>10.0f} evals{1000 * elapsed:>10.2f} ms")
+
+    def seed(x, y):
+        return CurveFitter().vectorized_optimization(x, y)
+
+    def counted(method):
+        def fit(x, y, critical_points):
+            fitter.evaluations = 0
+            method(x, y, critical_points)
+            return fitter.evaluations
+        return fit
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        run("L-BFGS-B, loop + finite differences",
+            lambda x, y, cp: _loop_refinement(x, y, cp, seed(x, y)) if cp else 0)
+        run("L-BFGS-B, vectorized + gradient", counted(fitter.vectorized_optimization))
+        run("curve_fit, finite differences",
+            lambda x, y, cp: curve_fit(cubic_function, x, y, p0=seed(x, y), maxfev=1000,
+                                       full_output=True)[2]['nfev'])
+        run("curve_fit, analytic Jacobian", counted(fitter.curve_fit_optimization))
+
+    # A tiny threshold keeps the early exit from firing, so close to the full budget is drawn
+    ransac = CurveFitter('ransac', ransac_threshold=1e-9, rng=np.random.default_rng(0))
+    hypotheses, started = 0, time.perf_counter()
+    for x, y, critical_points in decoded:
+        hypotheses += ransac.fit(np.column_stack([x, y])).evaluations
+    elapsed = time.perf_counter() - started
+    print(f"{'RANSAC':<36}{hypotheses / max(len(decoded), 1):>10.0f} hyps"
+          f"{1000 * elapsed / max(len(decoded), 1):>10.2f} ms  ({hypotheses / elapsed:,.0f} hypotheses/s)")
+
+
+def _stroke_points(func, width, line_width, x_range=(-10, 10), y_range=(-10, 10)):
+    """Grid coordinates of every pixel in a rasterized stroke of func, as a raw contour gives"""
+    height = width * 9 // 16
+    columns = np.arange(width)
+    x = x_range[0] + (x_range[1] - x_range[0]) * columns / (width - 1)
+    rows = (y_range[1] - func(x)) / (y_range[1] - y_range[0]) * (height - 1)
+    thickness = max(int(round(line_width * width / 800)), 1)
+    rows = np.round(rows)[:, None] + np.arange(thickness) - thickness // 2
+    keep = (rows >= 0) & (rows < height)
+    y = y_range[1] - rows * (y_range[1] - y_range[0]) / (height - 1)
+    return np.column_stack([np.broadcast_to(x[:, None], rows.shape)[keep], y[keep]])
+
+
+def bench_decimation(args):
+    """Fit time against resolution with and without error-bounded decimation"""
+    curves = {
+        'cubic': lambda x: (0.05 * x**3 - 0.2 * x**2 - 2 * x + 4) / 4,
+        'trigonometric': lambda x: 6 * np.sin(0.8 * x + 0.3) + 1,
+    }
+    # RANSAC is left out: it always fits every point
+    methods = ['auto', 'vectorized', 'curve_fit']
+    print(f"{'curve':<15}{'width':>6}{'points':>9}{'kept':>7}{'max dev':>9}"
+          + "".join(f"{m + ' full':>16}{'decimated':>11}{'err x':>7}" for m in methods))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name, func in curves.items():
+            for width in args.widths:
+                points = _stroke_points(func, width, args.line_width)
+                critical_points = [('y_intercept', 0.0, float(func(0.0)))]
+                row = ""
+                for method in methods:
+                    full = CurveFitter(method, rng=np.random.default_rng(0))
+                    decimated = CurveFitter(method, decimate_tolerance=args.tolerance,
+                                            decimate_min_points=0, rng=np.random.default_rng(0))
+                    results = []
+                    for fitter in (full, decimated):
+                        started = time.perf_counter()
+                        results.append(fitter.fit(points, critical_points))
+                        results[-1].elapsed = time.perf_counter() - started
+                    # Both errors are measured on every original point
+                    ratio = results[1].error / max(results[0].error, 1e-300)
+                    row += (f"{1000 * results[0].elapsed:>14.1f}ms{1000 * results[1].elapsed:>9.1f}ms"
+                            f"{ratio:>7.3f}")
+                kept = decimated.decimation
+                print(f"{name:<15}{width:>6}{len(points):>9}{len(kept.x):>7}{kept.max_deviation:>9.4f}{row}")
+
+
+def _loop_generation(optimizer, population, x, y, critical_points):
+    """The original generation: one error_function call and one child at a time"""
+    errors = np.array([optimizer.error_function(p, x, y, critical_points) for p in population])
+    new_population = list(population[np.argsort(errors)[:optimizer.elite_size]])
+    while len(new_population) < optimizer.population_size:
+        tournament_idx = np.random.choice(len(population), 3)
+        child = population[tournament_idx[np.argmin(errors[tournament_idx])]].copy()
+        if np.random.random() < optimizer.mutation_rate:
+            child = child + np.random.normal(0, optimizer.learning_rate, 4)
+        new_population.append(child)
+    return np.array(new_population)
+
+
+def bench_ga(args):
+    """GA generations/sec: per-individual loop versus whole-population array operations"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(-10, 10, args.points)
+    y = cubic_function(x, 0.2, -0.5, -3, 2) + rng.normal(0, 0.1, args.points)
+    critical_points = [('max', -2.8, 3.1), ('min', 4.4, -5.2), ('x_intercept', 0.6, 0.0),
+                       ('y_intercept', 0.0, 0.5)]
+
+    print(f"{args.points} points, {len(critical_points)} critical points")
+    print(f"{'population':>10}{'loop gen/s':>14}{'vectorized gen/s':>20}{'speedup':>10}")
+    for size in args.populations:
+        optimizer = FunctionOptimizer(population_size=size)
+        population = rng.uniform(-5, 5, (size, 4))
+
+        def vectorized():
+            errors = optimizer.population_errors(population, x, y, critical_points)
+            optimizer._evolve_population(population, errors, 0)
+
+        loop = _time_call(lambda: _loop_generation(optimizer, population, x, y, critical_points), repeat=2)
+        fast = _time_call(vectorized, repeat=5)
+        print(f"{size:>10}{1 / loop:>14,.1f}{1 / fast:>20,.1f}{loop / fast:>9.0f}x")
+
+
+class _TimedQueue:
+    """update_queue stand-in that stamps each result with its arrival time"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.items = []
+
+    def put(self, result):
+        self.items.append((time.perf_counter() - self.started, result))
+
+    def time_to(self, target):
+        """Seconds and generation at which the error first reached target, or None"""
+        return next(((t, result.generation) for t, result in self.items if result.error <= target), None)
+
+
+def bench_islands(args):
+    """Time to a target error against the number of GA islands (worker processes)"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(-10, 10, args.points)
+    y = cubic_function(x, 0.2, -0.5, -3, 2) + rng.normal(0, 0.1, args.points)
+
+    # Islands beyond the core count time-share, so generations show the gain independent of cores
+    print(f"{os.cpu_count()} cores, target error {args.target}, {args.repeat} seeds")
+    print(f"{'islands':>8}{'reached':>9}{'median s':>10}{'generations':>13}{'final error':>14}")
+    for islands in args.islands:
+        times, finals = [], []
+        for seed in range(args.repeat):
+            optimizer = FunctionOptimizer(max_attempts=args.max_attempts, islands=islands,
+                                          report_interval=0, report_improvement=0,
+                                          rng=np.random.default_rng(seed))
+            updates = _TimedQueue()
+            finals.append(optimizer.optimize(x, y, update_queue=updates)[1])
+            times.append(updates.time_to(args.target))
+        reached = np.array([t for t in times if t is not None]).reshape(-1, 2)
+        seconds = f"{np.median(reached[:, 0]):.2f}" if len(reached) else "-"
+        generations = f"{np.median(reached[:, 1]):.0f}" if len(reached) else "-"
+        print(f"{islands:>8}{len(reached):>6}/{args.repeat:<2}{seconds:>10}{generations:>13}"
+              f"{np.median(finals):>14.4f}")
+
+
+def _generated_curves(count, seed, x_range=(-3, 3), points=200):
+    """(x, y) samples of random generator functions, undefined points dropped"""
+    generator = FunctionGenerator(random.Random(seed))
+    x = np.linspace(*x_range, points)
+    curves = []
+    for func_type in FUNCTION_TYPES:
+        for batch in generator.generate_batch(func_type, count):
+            for values in batch.evaluate(x):
+                valid = np.isfinite(values) & (np.abs(values) < 1e3)
+                if np.count_nonzero(valid) > 10:
+                    curves.append((func_type, x[valid], values[valid]))
+    return curves
+
+
+def _optimal_error(optimizer, x, y):
+    """Exact minimum of error_function without critical points, which is quadratic in the parameters"""
+    A = cubic_design(x)
+    m = len(x)
+    DA = np.diff(A, axis=0)
+    hessian = A.T @ A / m + 0.01 * np.eye(4) + 0.1 * DA.T @ DA / (m - 1)
+    return optimizer.error_function(np.linalg.solve(hessian, A.T @ y / m), x, y)
+
+
+def bench_engines(args):
+    """Evaluations each FunctionOptimizer engine needs to converge on generated curves"""
+    curves = _generated_curves(args.curves, args.seed)
+    print(f"{len(curves)} curves, converged = within {args.tolerance:g} (relative) of the exact minimum, "
+          f"budget {args.max_attempts * 10 * args.population:,} evaluations")
+    print(f"{'engine':<8}{'converged':>11}{'median evals':>15}{'p90 evals':>12}{'ms/run':>9}")
+    for engine in OPTIMIZER_ENGINES:
+        needed, started = [], time.perf_counter()
+        for i, (_, x, y) in enumerate(curves):
+            # One generation per batch so every improvement is reported with its evaluation count
+            optimizer = FunctionOptimizer(max_attempts=args.max_attempts * 10, batch_size=1,
+                                          population_size=args.population, engine=engine,
+                                          report_interval=0, report_improvement=0,
+                                          rng=np.random.default_rng(i))
+            target = _optimal_error(optimizer, x, y) * (1 + args.tolerance)
+            updates = _TimedQueue()
+            optimizer.optimize(x, y, update_queue=updates)
+            needed.append(next((r.evaluations for _, r in updates.items if r.error <= target), None))
+        elapsed = (time.perf_counter() - started) / len(curves)
+        converged = np.array([n for n in needed if n is not None])
+        median = f"{np.median(converged):,.0f}" if len(converged) else "-"
+        p90 = f"{np.percentile(converged, 90):,.0f}" if len(converged) else "-"
+        print(f"{engine:<8}{len(converged):>7}/{len(curves):<3}{median:>15}{p90:>12}{1000 * elapsed:>9.0f}")
+
+
+def bench_minibatch(args):
+    """Generation cost and final error against point count, full versus mini-batch fitness"""
+    rng = np.random.default_rng(0)
+    print(f"engine {args.engine}, mini-batch of {args.minibatch} growing to at most {args.minibatch_max}")
+    print(f"{'points':>8}{'fitness':>12}{'ms/gen':>9}{'generations':>13}{'seconds':>9}{'error':>14}")
+    for points in args.points:
+        x = np.sort(rng.uniform(-10, 10, points))
+        y = cubic_function(x, 0.2, -0.5, -3, 2) + rng.normal(0, 0.5, points)
+        for minibatch in (None, args.minibatch):
+            optimizer = FunctionOptimizer(engine=args.engine, minibatch=minibatch,
+                                          minibatch_max=args.minibatch_max, rng=np.random.default_rng(0))
+            updates = _TimedQueue()
+            started = time.perf_counter()
+            _, error = optimizer.optimize(x, y, update_queue=updates)
+            elapsed = time.perf_counter() - started
+            generations = updates.items[-1][1].generation
+            label = 'full' if minibatch is None else 'mini-batch'
+            print(f"{points:>8}{label:>12}{1000 * elapsed / generations:>9.2f}{generations:>13}"
+                  f"{elapsed:>9.2f}{error:>14.6f}")
+
+
+def bench_checkpoint(args):
+    """Checkpoint size and write time per engine, and whether a resumed run matches an uninterrupted one"""
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(-10, 10, args.points))
+    y = cubic_function(x, 0.2, -0.5, -3, 2) + rng.normal(0, 0.5, args.points)
+    # No stopping rule, so both runs do exactly the same number of generations
+    settings = dict(batch_size=10, patience=None, target_error=0, silent=True,
+                    population_size=args.population)
+
+    print(f"{args.points} points, population {args.population}, "
+          f"{args.generations} + {args.generations} generations")
+    print(f"{'engine':<8}{'KiB':>7}{'write ms':>10}{'read ms':>9}{'resumed == straight':>22}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'checkpoint.npz')
+        for engine in OPTIMIZER_ENGINES:
+            def optimizer(generations):
+                return FunctionOptimizer(max_attempts=generations // 10, engine=engine,
+                                         rng=np.random.default_rng(args.seed), **settings)
+
+            straight = optimizer(2 * args.generations).optimize(x, y)
+            first = optimizer(args.generations)
+            first.optimize(x, y)
+            write = _time_call(lambda: first.snapshot(path))
+            resumed = optimizer(2 * args.generations)
+            read = _time_call(lambda: resumed.restore(path))
+            params, error = resumed.optimize(x, y)
+            same = np.array_equal(params, straight[0]) and error == straight[1]
+            print(f"{engine:<8}{os.path.getsize(path) / 1024:>7.1f}{1000 * write:>10.2f}"
+                  f"{1000 * read:>9.2f}{str(same):>22}")
+
+
+def bench_redraw(args):
+    """Milliseconds per decoder panel update: full re-render versus cached overlay and blit"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    processor = ImageProcessor()
+    image = cv2.imread(args.image)
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    image = cv2.resize(image, (width, height), interpolation=cv2.INTER_CUBIC)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        points, grid_info = processor.process_image(image)
+
+    def panel():
+        canvas = FigureCanvasAgg(Figure(figsize=(6, 8)))
+        return canvas, canvas.figure.add_subplot(111)
+
+    # The original update: new overlay images, imshow and a full draw every time
+    canvas, ax = panel()
+
+    def full_render():
+        overlay = processor.visualize_function(image, points, grid_info)
+        ax.clear()
+        ax.imshow(cv2.cvtColor(overlay, cv2.COLOR_BGR2RGB))
+        ax.axis('off')
+        canvas.draw()
+
+    canvas2, ax2 = panel()
+    view = OverlayView(ax2, canvas2)
+    view.set_image(cv2.cvtColor(processor.visualize_function(image, points, grid_info),
+                                cv2.COLOR_BGR2RGB))
+    canvas2.draw()
+    xs = np.linspace(0, width, 400)
+
+    def blit_curve():
+        view.set_curve(xs, height / 2 + height / 4 * np.sin(xs / width * 6 * np.random.rand()))
+
+    print(f"{width}x{height}, {len(points)} points")
+    print(f"{'full re-render':<24}{1000 * _time_call(full_render):>8.1f} ms")
+    print(f"{'cached overlay + blit':<24}{1000 * _time_call(blit_curve):>8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = subparsers.add_parser('compile', help=bench_compile.__doc__)
+    compile_parser.add_argument('--subs-points', type=int, default=2000,
+                                help="Points evaluated with the slow subs path")
+    compile_parser.set_defaults(func=bench_compile)
+
+    sampling_parser = subparsers.add_parser('sampling', help=bench_sampling.__doc__)
+    sampling_parser.add_argument('--tolerance', type=float, default=0.001)
+    sampling_parser.set_defaults(func=bench_sampling)
+
+    templates_parser = subparsers.add_parser('templates', help=bench_templates.__doc__)
+    templates_parser.add_argument('--instances', type=int, default=200)
+    templates_parser.add_argument('--batch', type=int, default=100000)
+    templates_parser.add_argument('--points', type=int, default=200)
+    templates_parser.set_defaults(func=bench_templates)
+
+    fitting_parser = subparsers.add_parser('fitting', help=bench_fitting.__doc__)
+    fitting_parser.add_argument('images', help="Directory or glob of chart images, e.g. from render_charts.py")
+    fitting_parser.add_argument('--limit', type=int, default=100)
+    fitting_parser.set_defaults(func=bench_fitting)
+
+    decimation_parser = subparsers.add_parser('decimation', help=bench_decimation.__doc__)
+    decimation_parser.add_argument('--widths', nargs='+', type=int, default=[800, 1920, 3840, 7680])
+    decimation_parser.add_argument('--line-width', type=float, default=2.0,
+                                   help="Stroke width in pixels at 800 wide, scaled with the width")
+    decimation_parser.add_argument('--tolerance', type=float, default=0.002,
+                                   help="Decimation bound as a fraction of the y range")
+    decimation_parser.set_defaults(func=bench_decimation)
+
+    ga_parser = subparsers.add_parser('ga', help=bench_ga.__doc__)
+    ga_parser.add_argument('--populations', nargs='+', type=int, default=[50, 500, 5000])
+    ga_parser.add_argument('--points', type=int, default=200)
+    ga_parser.set_defaults(func=bench_ga)
+
+    islands_parser = subparsers.add_parser('islands', help=bench_islands.__doc__)
+    islands_parser.add_argument('--islands', nargs='+', type=int, default=[1, 2, 4])
+    islands_parser.add_argument('--target', type=float, default=0.3)
+    islands_parser.add_argument('--points', type=int, default=200)
+    islands_parser.add_argument('--max-attempts', type=int, default=200,
+                                help="Batches of 10 generations per island")
+    islands_parser.add_argument('--repeat', type=int, default=8)
+    islands_parser.set_defaults(func=bench_islands)
+
+    engines_parser = subparsers.add_parser('engines', help=bench_engines.__doc__)
+    engines_parser.add_argument('--curves', type=int, default=4, help="Curves per function type")
+    engines_parser.add_argument('--population', type=int, default=50)
+    engines_parser.add_argument('--max-attempts', type=int, default=100,
+                                help="Batches of 10 generations per run")
+    engines_parser.add_argument('--tolerance', type=float, default=1e-3)
+    engines_parser.add_argument('--seed', type=int, default=0)
+    engines_parser.set_defaults(func=bench_engines)
+
+    minibatch_parser = subparsers.add_parser('minibatch', help=bench_minibatch.__doc__)
+    minibatch_parser.add_argument('--points', nargs='+', type=int, default=[5000, 20000, 50000])
+    minibatch_parser.add_argument('--engine', choices=OPTIMIZER_ENGINES, default='cmaes')
+    minibatch_parser.add_argument('--minibatch', type=int, default=256)
+    minibatch_parser.add_argument('--minibatch-max', type=int, default=4096)
+    minibatch_parser.set_defaults(func=bench_minibatch)
+
+    checkpoint_parser = subparsers.add_parser('checkpoint', help=bench_checkpoint.__doc__)
+    checkpoint_parser.add_argument('--points', type=int, default=2000)
+    checkpoint_parser.add_argument('--population', type=int, default=100)
+    checkpoint_parser.add_argument('--generations', type=int, default=200,
+                                   help="Generations before and after the checkpoint (multiple of 10)")
+    checkpoint_parser.add_argument('--seed', type=int, default=0)
+    checkpoint_parser.set_defaults(func=bench_checkpoint)
+
+    redraw_parser = subparsers.add_parser('redraw', help=bench_redraw.__doc__)
+    redraw_parser.add_argument('image', help="Chart image, resized to --size")
+    redraw_parser.add_argument('--size', default='3840x2160')
+    redraw_parser.set_defaults(func=bench_redraw)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
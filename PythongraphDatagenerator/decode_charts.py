@@ -0,0 +1,171 @@
+"""Headless batch decoding of chart images into JSONL.
+
+Every image goes through ImageProcessor.process_image and a CurveFitter in
+a worker process; one JSON line per image records the fitted parameters,
+the fit error, the detected critical points and per-stage timings. No
+display or Tk is needed.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from Utils.curve_fitting import DECIMATE_TOLERANCE, FIT_METHODS, CurveFitter, FitJob
+from Utils.image_processing import ImageProcessor
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+# Per-process pipeline, built once by the pool initializer
+_processor = None
+_fitter = None
+_budget = {}
+_seed = None
+
+
+def _init_worker(method, time_budget=None, max_evaluations=None, decimate_tolerance=None, seed=None):
+    global _processor, _fitter, _budget, _seed
+    _processor = ImageProcessor()
+    _fitter = CurveFitter(method, decimate_tolerance=decimate_tolerance or None)
+    _budget = {'time_budget': time_budget, 'max_evaluations': max_evaluations}
+    _seed = seed
+
+
+def _completed(output_path):
+    """Records already in output_path, dropping a line cut short by an interrupted run"""
+    records = []
+    if os.path.exists(output_path):
+        with open(output_path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+    return records
+
+
+def find_images(inputs):
+    """Image paths from directories, globs and plain file names, sorted and deduplicated"""
+    paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            paths.update(os.path.join(pattern, name) for name in os.listdir(pattern))
+        else:
+            paths.update(glob.glob(pattern))
+    return sorted(p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def decode_image(path):
+    """Decode one image into a JSON-serializable record"""
+    record = {'image': path}
+    timings = {}
+    try:
+        started = time.perf_counter()
+        image = cv2.imread(path)
+        if image is None:
+            raise ValueError("Failed to load image")
+        timings['load'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        points, grid_info = _processor.process_image(image)
+        timings['process'] = time.perf_counter() - started
+
+        critical_points = grid_info.critical_points if grid_info else []
+        record['grid_detected'] = grid_info is not None
+        record['num_points'] = len(points)
+        record['critical_points'] = [[kind, float(x), float(y)] for kind, x, y in critical_points]
+        if not len(points):
+            raise ValueError("No graph points detected")
+
+        if _seed is not None:
+            # Seeded per image, so results do not depend on which worker got it
+            _fitter.rng = np.random.default_rng([_seed, zlib.crc32(path.encode())])
+        started = time.perf_counter()
+        result = _fitter.fit(points, critical_points, job=FitJob(**_budget))
+        timings['fit'] = time.perf_counter() - started
+
+        record['function_type'] = result.function_type
+        record['params'] = [float(p) for p in result.params]
+        record['error'] = float(result.error)
+        record['evaluations'] = int(result.evaluations)
+        if _fitter.decimation is not None:
+            record['fit_points'] = len(_fitter.decimation.x)
+        if result.stop_reason:
+            record['stop_reason'] = result.stop_reason
+        if _fitter.method == 'auto':
+            record['scores'] = _fitter.scores
+    except Exception as e:
+        record['failure'] = str(e)
+
+    record['timings'] = timings
+    return record
+
+
+def decode_images(paths, output_path, method='auto', workers=None, chunksize=8,
+                  time_budget=None, max_evaluations=None, decimate_tolerance=DECIMATE_TOLERANCE,
+                  seed=None, resume=False):
+    """Decode paths across worker processes, writing records in input order
+
+    time_budget (seconds) and max_evaluations bound each image's fit; a fit
+    that hits either keeps its best result so far. decimate_tolerance is
+    the CurveFitter decimation bound; 0 or None fits every point. With a
+    seed every image's fit is reproducible. With resume, images already in
+    output_path are kept and skipped, so a restarted batch picks up where
+    the previous run stopped.
+    """
+    workers = workers or os.cpu_count() or 1
+    decoded = failed = 0
+
+    done = _completed(output_path) if resume else []
+    skipped = {record['image'] for record in done}
+    paths = [path for path in paths if path not in skipped]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(method, time_budget, max_evaluations, decimate_tolerance, seed)) as executor, \
+            open(output_path, 'w') as f:
+        # Rewritten rather than appended to, which also drops a truncated last line
+        for record in done:
+            f.write(json.dumps(record) + '\n')
+        f.flush()
+        for record in executor.map(decode_image, paths, chunksize=chunksize):
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            decoded += 1
+            failed += 'failure' in record
+
+    return decoded, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode chart images without a GUI")
+    parser.add_argument('inputs', nargs='+', help="Image files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default='decoded.jsonl', help="JSONL output file")
+    parser.add_argument('--method', choices=FIT_METHODS, default='auto')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--chunksize', type=int, default=8, help="Images handed to a worker at a time")
+    parser.add_argument('--time-budget', type=float, default=None, help="Seconds of fitting per image")
+    parser.add_argument('--max-evaluations', type=int, default=None, help="Objective evaluations per image")
+    parser.add_argument('--decimate-tolerance', type=float, default=DECIMATE_TOLERANCE,
+                        help="Max deviation of decimated points as a fraction of the y range (0: fit every point)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible fits")
+    parser.add_argument('--resume', action='store_true',
+                        help="Keep the records already in the output file and decode only the remaining images")
+    args = parser.parse_args()
+
+    paths = find_images(args.inputs)
+    started = time.perf_counter()
+    decoded, failed = decode_images(paths, args.output, args.method, args.workers, args.chunksize,
+                                    args.time_budget, args.max_evaluations, args.decimate_tolerance,
+                                    args.seed, args.resume)
+    elapsed = time.perf_counter() - started
+    print(f"Decoded {decoded} images ({failed} failed) in {elapsed:.2f}s "
+          f"({decoded / elapsed if elapsed else 0:,.1f} images/s)")
+
+
+if __name__ == "__main__":
+    main()
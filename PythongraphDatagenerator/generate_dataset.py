@@ -0,0 +1,147 @@
+"""Headless dataset generation: random functions sampled in a process pool.
+
+Writes one JSON-lines (or .npz) shard per work unit plus a manifest.json
+describing every shard. Never imports tkinter, so it runs on display-less machines.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from Utils.function_generator import FUNCTION_TYPES, FunctionGenerator
+from Utils.point_io import save_points_npz
+
+
+def generate_shard(shard_index, start, count, function_types, x_range, step, seed,
+                   output_dir, output_format='jsonl', tolerance=None, solve_timeout=0):
+    """Generate, sample and write one shard of functions"""
+    # The default 0 keeps critical points numeric, so shards do not depend on timing
+    generator = FunctionGenerator(rng=random.Random(f"{seed}-{shard_index}"), solve_timeout=solve_timeout)
+    filename = f"shard-{shard_index:05d}.{output_format}"
+    by_type = {func_type: 0 for func_type in function_types}
+    total_points = 0
+
+    started = time.perf_counter()
+    if output_format == 'npz':
+        # One archive per shard: concatenated arrays indexed by per-function offsets
+        xs, ys, functions = [], [], []
+        for i in range(start, start + count):
+            func_type = function_types[i % len(function_types)]
+            generated = generator.generate(func_type)
+            x, y, segments = generator.sample_segments(generated, x_range, step, tolerance)
+            metadata = generator.export_metadata(generated, x_range, step, tolerance)
+            metadata.update(index=i, offset=total_points, count=len(x), segments=segments)
+
+            xs.append(x)
+            ys.append(y)
+            functions.append(metadata)
+            by_type[func_type] += 1
+            total_points += len(x)
+
+        save_points_npz(os.path.join(output_dir, filename),
+                        np.concatenate(xs), np.concatenate(ys), {'functions': functions})
+    else:
+        with open(os.path.join(output_dir, filename), 'w') as f:
+            for i in range(start, start + count):
+                # Round-robin over types keeps every shard balanced
+                func_type = function_types[i % len(function_types)]
+                generated = generator.generate(func_type)
+                record = generator.export_record(generated, x_range, step, tolerance)
+                record['index'] = i
+
+                f.write(json.dumps(record) + "\n")
+                by_type[func_type] += 1
+                total_points += len(record['points'])
+
+    return {
+        'file': filename,
+        'shard': shard_index,
+        'start_index': start,
+        'functions': count,
+        'points': total_points,
+        'by_type': by_type,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def generate_dataset(count, output_dir, function_types=None, x_range=(-12, 12),
+                     step=0.001, shard_size=100, workers=None, seed=0, output_format='jsonl',
+                     tolerance=None, solve_timeout=0):
+    """Generate count functions across worker processes and write a manifest"""
+    function_types = list(function_types or FUNCTION_TYPES)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+
+    shards = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for shard_index, start in enumerate(range(0, count, shard_size)):
+            futures.append(executor.submit(
+                generate_shard, shard_index, start, min(shard_size, count - start),
+                function_types, tuple(x_range), step, seed, output_dir, output_format, tolerance,
+                solve_timeout
+            ))
+
+        for future in as_completed(futures):
+            shard = future.result()
+            shards.append(shard)
+            print(f"{shard['file']}: {shard['functions']} functions in {shard['seconds']:.2f}s")
+
+    shards.sort(key=lambda s: s['shard'])
+    elapsed = time.perf_counter() - started
+
+    manifest = {
+        'functions': count,
+        'points': sum(s['points'] for s in shards),
+        'function_types': function_types,
+        'x_range': list(x_range),
+        'step_size': step,
+        'tolerance': tolerance,
+        'solve_timeout': solve_timeout,
+        'format': output_format,
+        'seed': seed,
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'shards': shards
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a function dataset without a GUI")
+    parser.add_argument('count', type=int, help="Number of functions to generate")
+    parser.add_argument('-o', '--output', default='dataset', help="Output directory")
+    parser.add_argument('--types', nargs='+', choices=FUNCTION_TYPES,
+                        help="Function types to cycle through (default: all)")
+    parser.add_argument('--x-range', nargs=2, type=float, default=(-12, 12))
+    parser.add_argument('--step', type=float, default=0.001, help="Sampling step size")
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="Sample adaptively to this error tolerance instead of a fixed step")
+    parser.add_argument('--shard-size', type=int, default=100, help="Functions per shard file")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=['jsonl', 'npz'], default='jsonl',
+                        help="Shard file format")
+    parser.add_argument('--solve-timeout', type=float, default=0,
+                        help="Seconds of symbolic solving per function (0: numeric critical points only)")
+    args = parser.parse_args()
+
+    manifest = generate_dataset(
+        args.count, args.output, args.types, args.x_range, args.step,
+        args.shard_size, args.workers, args.seed, args.format, args.tolerance,
+        args.solve_timeout
+    )
+    print(f"Wrote {manifest['functions']} functions ({manifest['points']} points) "
+          f"in {manifest['seconds']:.2f}s with {manifest['workers']} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,24 @@
 
+import argparse
+import random
 import numpy as np
 import matplotlib.pyplot as plt
-from random import choice, uniform
 from scipy.optimize import fsolve, minimize
 import tkinter as tk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import sympy as sp
-import json
+import os
 from matplotlib.gridspec import GridSpec
 
+from Utils.adaptive_sampling import adaptive_sample
+from Utils.function_generator import FunctionGenerator
+from Utils.segmentation import insert_breaks
+
 class EnhancedFunctionGenerator:
-    def __init__(self):
-        self.function_types = [
-            'logarithmic',
-            'exponential',
-            'rational',
-            'trigonometric',
-            'linear'
-        ]
+    def __init__(self, seed=None):
+        # A seed makes the sequence of generated functions reproducible
+        self.generator = FunctionGenerator(rng=random.Random(seed))
+        self.function_types = self.generator.function_types
+        self.current_function = None
         self.current_func = None
         self.current_label = None
         self.current_expr = None
@@ -68,14 +69,26 @@ class EnhancedFunctionGenerator:
         self.y_max.insert(0, "12")
         self.y_max.grid(row=1, column=3)
         
-        # Step size input
+        # Sampling mode: the value is a step size (uniform) or an error tolerance (adaptive)
         step_frame = tk.Frame(control_frame, bg='#2b2b2b')
         step_frame.pack(pady=5)
-        tk.Label(step_frame, text="Step size:", bg='#2b2b2b', fg='white').pack(side=tk.LEFT)
+        tk.Label(step_frame, text="Sampling:", bg='#2b2b2b', fg='white').pack(side=tk.LEFT)
+        self.sampling_var = tk.StringVar(value='uniform')
+        sampling_menu = tk.OptionMenu(step_frame, self.sampling_var, 'uniform', 'adaptive')
+        sampling_menu.configure(width=8, bg='#404040', fg='white')
+        sampling_menu.pack(side=tk.LEFT, padx=5)
+        tk.Label(step_frame, text="Step / tolerance:", bg='#2b2b2b', fg='white').pack(side=tk.LEFT)
         self.step_size = tk.Entry(step_frame, width=8, bg='#404040', fg='white')
         self.step_size.insert(0, "0.001")
         self.step_size.pack(side=tk.LEFT, padx=5)
         
+        # Export format selection
+        tk.Label(step_frame, text="Format:", bg='#2b2b2b', fg='white').pack(side=tk.LEFT)
+        self.export_format_var = tk.StringVar(value='json')
+        format_menu = tk.OptionMenu(step_frame, self.export_format_var, 'json', 'npz', 'npz32')
+        format_menu.configure(width=6, bg='#404040', fg='white')
+        format_menu.pack(side=tk.LEFT, padx=5)
+        
         # Action buttons
         button_frame = tk.Frame(control_frame, bg='#2b2b2b')
         button_frame.pack(pady=5)
@@ -103,120 +116,18 @@ class EnhancedFunctionGenerator:
         self.info_text.pack(pady=5)
 
     def generate_random_function(self):
-        func_type = self.func_type_var.get()
-        x = sp.Symbol('x')
-        
-        a = round(uniform(0.5, 2), 2)
-        b = round(uniform(-2, 2), 2)
-        c = round(uniform(-2, 2), 2)
-        
-        if func_type == 'logarithmic':
-            expr = a * sp.log(abs(b * x + c)) + round(uniform(-2, 2), 2)
-            label = f'{a:.2f} * ln(|{b:.2f}x + {c:.2f}|) + {round(uniform(-2, 2), 2):.2f}'
-            
-            def func(x_val):
-                try:
-                    return float(expr.subs(x, x_val))
-                except:
-                    return np.nan
-                    
-        elif func_type == 'exponential':
-            expr = a * sp.exp(b * x) + c
-            label = f'{a:.2f} * e^({b:.2f}x) + {c:.2f}'
-            
-            def func(x_val):
-                try:
-                    return float(expr.subs(x, x_val))
-                except:
-                    return np.nan
-                    
-        elif func_type == 'rational':
-            d = round(uniform(-2, 2), 2)
-            expr = (a * x + b) / (c * x + d)
-            label = f'({a:.2f}x + {b:.2f})/({c:.2f}x + {d:.2f})'
-            
-            def func(x_val):
-                try:
-                    if abs(c * x_val + d) < 1e-10:
-                        return np.nan
-                    return float(expr.subs(x, x_val))
-                except:
-                    return np.nan
-                    
-        elif func_type == 'trigonometric':
-            trig_choice = choice(['sin', 'cos', 'tan'])
-            if trig_choice == 'sin':
-                expr = a * sp.sin(b * x) + c
-            elif trig_choice == 'cos':
-                expr = a * sp.cos(b * x) + c
-            else:
-                expr = a * sp.tan(b * x) + c
-            label = f'{a:.2f} * {trig_choice}({b:.2f}x) + {c:.2f}'
-            
-            def func(x_val):
-                try:
-                    result = float(expr.subs(x, x_val))
-                    if abs(result) > 1e10:
-                        return np.nan
-                    return result
-                except:
-                    return np.nan
-                    
-        else:  # linear
-            expr = a * x + b
-            label = f'{a:.2f}x + {b:.2f}'
-            
-            def func(x_val):
-                return float(expr.subs(x, x_val))
+        generated = self.generator.generate(self.func_type_var.get())
         
-        self.current_expr = expr
-        self.current_symbol = x
-        self.current_func = func
-        self.current_label = label
+        self.current_function = generated
+        self.current_expr = generated.expr
+        self.current_symbol = generated.symbol
+        self.current_func = generated.func
+        self.current_label = generated.label
         
-        return func, label
+        return generated.func, generated.label
 
     def find_critical_points(self, func, x_range):
-        critical_points = []
-        x = self.current_symbol
-        expr = self.current_expr
-        
-        try:
-            # Find derivative
-            derivative = sp.diff(expr, x)
-            
-            # Find critical points
-            critical_vals = sp.solve(derivative, x)
-            real_critical_vals = [float(val.evalf()) for val in critical_vals if val.is_real]
-            valid_critical_vals = [val for val in real_critical_vals 
-                                 if x_range[0] <= val <= x_range[1]]
-            
-            # Find x-intercepts
-            x_intercepts = sp.solve(expr, x)
-            real_x_intercepts = [float(val.evalf()) for val in x_intercepts if val.is_real]
-            valid_x_intercepts = [val for val in real_x_intercepts 
-                                if x_range[0] <= val <= x_range[1]]
-            
-            critical_points.append(f"X-intercepts: {[round(x, 6) for x in valid_x_intercepts]}")
-            
-            # Find y-intercept
-            if x_range[0] <= 0 <= x_range[1]:
-                y_intercept = float(expr.subs(x, 0))
-                critical_points.append(f"Y-intercept: {round(y_intercept, 6)}")
-            
-            # Evaluate critical points
-            for val in valid_critical_vals:
-                y_val = float(expr.subs(x, val))
-                second_deriv = float(sp.diff(derivative, x).subs(x, val))
-                if second_deriv > 0:
-                    critical_points.append(f"Local minimum: ({round(val, 6)}, {round(y_val, 6)})")
-                elif second_deriv < 0:
-                    critical_points.append(f"Local maximum: ({round(val, 6)}, {round(y_val, 6)})")
-            
-        except Exception as e:
-            critical_points.append(f"Error finding critical points: {str(e)}")
-            
-        return critical_points
+        return self.generator.find_critical_points(self.current_function, x_range)
 
     def plot_function(self):
         try:
@@ -225,17 +136,17 @@ class EnhancedFunctionGenerator:
             
             func, label = self.generate_random_function()
             
-            # Generate points with high resolution
-            x = np.linspace(x_range[0], x_range[1], 5000)
-            y = np.array([func(xi) for xi in x])
-            
-            # Filter valid points
-            mask = np.isfinite(y)
-            x, y = x[mask], y[mask]
+            # Generate points with high resolution, or only where the curve bends
+            if self.sampling_var.get() == 'adaptive':
+                tolerance = float(self.step_size.get())
+                x, y = adaptive_sample(func, x_range, tolerance, y_limits=y_range)
+            else:
+                x = np.linspace(x_range[0], x_range[1], 5000)
+                y = func(x)
             
-            # Apply y-range limits
-            mask = (y >= y_range[0]) & (y <= y_range[1])
-            x, y = x[mask], y[mask]
+            # Break the line at undefined points and at jumps across poles so
+            # segments are drawn separately; the axes clip to the y-range
+            x, y = insert_breaks(x, y)
             
             # Clear and set up plot
             self.ax.clear()
@@ -250,22 +161,17 @@ class EnhancedFunctionGenerator:
             self.ax.axvline(x=0, color='white', linewidth=0.5, alpha=0.5)
             
             # Plot critical points
-            critical_points = self.find_critical_points(func, x_range)
-            for point in critical_points:
-                if "intercept" in point.lower():
-                    coords = eval(point.split(": ")[1])
-                    if isinstance(coords, list):
-                        for x_val in coords:
-                            self.ax.plot(x_val, 0, 'ro', markersize=8)
-                    else:
-                        self.ax.plot(0, coords, 'ro', markersize=8)
-                elif "minimum" in point.lower() or "maximum" in point.lower():
-                    coords = eval(point.split(": ")[1])
-                    self.ax.plot(coords[0], coords[1], 'yo', markersize=8)
-                    self.ax.annotate(f'({coords[0]:.2f}, {coords[1]:.2f})',
-                                   (coords[0], coords[1]), xytext=(10, 10),
-                                   textcoords='offset points', color='white',
-                                   bbox=dict(facecolor='#404040', alpha=0.7))
+            analysis = self.find_critical_points(func, x_range)
+            for x_val in analysis.x_intercepts:
+                self.ax.plot(x_val, 0, 'ro', markersize=8)
+            if analysis.y_intercept is not None:
+                self.ax.plot(0, analysis.y_intercept, 'ro', markersize=8)
+            for px, py in analysis.minima + analysis.maxima:
+                self.ax.plot(px, py, 'yo', markersize=8)
+                self.ax.annotate(f'({px:.2f}, {py:.2f})',
+                               (px, py), xytext=(10, 10),
+                               textcoords='offset points', color='white',
+                               bbox=dict(facecolor='#404040', alpha=0.7))
             
             # Set limits and display
             self.ax.set_xlim(x_range)
@@ -275,8 +181,8 @@ class EnhancedFunctionGenerator:
             # Update info text
             self.info_text.delete(1.0, tk.END)
             self.info_text.insert(tk.END, f"Function: {label}\n\n")
-            for point in critical_points:
-                self.info_text.insert(tk.END, point + "\n")
+            for line in analysis.to_lines():
+                self.info_text.insert(tk.END, line + "\n")
                 
         except Exception as e:
             self.info_text.delete(1.0, tk.END)
@@ -291,30 +197,36 @@ class EnhancedFunctionGenerator:
         try:
             x_range = (float(self.x_min.get()), float(self.x_max.get()))
             step = float(self.step_size.get())
+            # In adaptive mode the field holds an error tolerance instead of a step
+            tolerance = step if self.sampling_var.get() == 'adaptive' else None
             
-            x = np.arange(x_range[0], x_range[1] + step, step)
-            y = np.array([self.current_func(xi) for xi in x])
-            
-            mask = np.isfinite(y)
-            x, y = x[mask], y[mask]
-            points = [{'x': float(xi), 'y': float(yi)} for xi, yi in zip(x, y)]
-            filename = f"function_points_{self.func_type_var.get()}_{len(points)}.json"
-            
-            data = {
-                'function_type': self.func_type_var.get(),
-                'label': self.current_label,
-                'x_range': list(x_range),
-                'step_size': step,
-                'points': points,
-                'critical_points': self.find_critical_points(self.current_func, x_range)
-            }
+            export_format = self.export_format_var.get()
+            func_type = self.current_function.function_type
             
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Stream to a temporary name since the point count is only known afterwards
+            extension = 'json' if export_format == 'json' else 'npz'
+            partial = f"function_points_{func_type}.partial.{extension}"
+            try:
+                if export_format == 'json':
+                    total_points = self.generator.export_json(
+                        self.current_function, x_range, step, partial, tolerance=tolerance
+                    )
+                else:
+                    dtype = np.float32 if export_format == 'npz32' else np.float64
+                    total_points = self.generator.export_npz(
+                        self.current_function, x_range, step, partial, dtype=dtype, tolerance=tolerance
+                    )
+            except BaseException:
+                # Never leave a half-written export behind
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+            filename = f"function_points_{func_type}_{total_points}.{extension}"
+            os.replace(partial, filename)
                 
             self.info_text.delete(1.0, tk.END)
             self.info_text.insert(tk.END, f"Points exported to {filename}\n")
-            self.info_text.insert(tk.END, f"Total points: {len(points)}\n")
+            self.info_text.insert(tk.END, f"Total points: {total_points}\n")
             
         except Exception as e:
             self.info_text.delete(1.0, tk.END)
@@ -368,9 +280,12 @@ def create_custom_style():
     return style
 
 def main():
+    parser = argparse.ArgumentParser(description="Enhanced Function Generator")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible functions")
+    args = parser.parse_args()
     try:
         # Set up application
-        generator = EnhancedFunctionGenerator()
+        generator = EnhancedFunctionGenerator(args.seed)
         generator.run()
     except Exception as e:
         print(f"Error starting application: {str(e)}")